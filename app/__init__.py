@@ -4,29 +4,94 @@ from flask import Flask
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_migrate import Migrate # <--- 1. Import Flask-Migrate
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from app.cli import register_commands
 from app.models import db
 from app.routes import register_routes
+from app.utils import db_routing
+from app.utils.metrics import metrics
+from app.utils.query_stats import query_stats
+from app.utils.rate_limit import rate_limiter
 from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def engine_options(prefix, url):
+    """
+    Connection pool settings from <prefix>_POOL_SIZE, _MAX_OVERFLOW,
+    _POOL_TIMEOUT (seconds), _POOL_RECYCLE (seconds) and _POOL_PRE_PING.
+    Size, overflow and timeout only apply to a QueuePool; in-memory SQLite
+    uses a single-connection pool that rejects them.
+    """
+    options = {
+        "pool_recycle": int(os.getenv(f"{prefix}_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv(f"{prefix}_POOL_PRE_PING", "true").lower() == "true",
+    }
+    url = make_url(url)
+    if issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+        options.update(
+            pool_size=int(os.getenv(f"{prefix}_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv(f"{prefix}_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv(f"{prefix}_POOL_TIMEOUT", "10")),
+        )
+    return options
+
+
 def create_app():
     app = Flask(__name__)
 
-    # MySQL configuration (Kept your existing MySQL config)
-    app.config["SQLALCHEMY_DATABASE_URI"] = (
+    # MySQL configuration (Kept your existing MySQL config); DATABASE_URL overrides it
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL") or (
         f"mysql+mysqldb://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}"
     )
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options("DB", app.config["SQLALCHEMY_DATABASE_URI"])
+    # Optional read replica: GET-request reads go there (see app/utils/db_routing.py)
+    replica_url = os.getenv("DATABASE_REPLICA_URL")
+    if replica_url:
+        app.config["SQLALCHEMY_BINDS"] = {
+            db_routing.REPLICA: {"url": replica_url, **engine_options("DB_REPLICA", replica_url)},
+        }
+    # How long a user's reads stay on the primary after they write (covers replication lag)
+    app.config["REPLICA_STICKY_SECONDS"] = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET")
+    # Password hashing pool (see app/services/password_hashing.py).
+    # PASSWORD_HASH_METHOD must be the full werkzeug method string, e.g. "scrypt:32768:8:1".
+    app.config["PASSWORD_HASH_METHOD"] = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    app.config["PASSWORD_HASH_WORKERS"] = int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or None
+    app.config["PASSWORD_HASH_QUEUE"] = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
+    # Let GET admin endpoints rely on the signed is_admin claim (skips the auth cache)
+    app.config["AUTH_TRUST_CLAIMS_ON_READ"] = os.getenv("AUTH_TRUST_CLAIMS_ON_READ", "false").lower() == "true"
+    # In-memory occupancy cache for availability read paths (search, calendars)
+    app.config["OCCUPANCY_CACHE_ENABLED"] = os.getenv("OCCUPANCY_CACHE", "false").lower() == "true"
+    # Long-polls (/events/wait) parked at once per process; each one holds a worker thread
+    app.config["EVENTS_MAX_WAITERS"] = int(os.getenv("EVENTS_MAX_WAITERS", "32"))
+    # Browser max-age for cached public catalog responses; 0 = always revalidate (cheap 304)
+    app.config["PUBLIC_CACHE_MAX_AGE"] = int(os.getenv("PUBLIC_CACHE_MAX_AGE", "0"))
 
     # Initialize extensions
     db.init_app(app)
+    db_routing.init_app(app)
     Migrate(app, db) # <--- 2. Initialize Migrate with app and db
     JWTManager(app)
-    CORS(app, resources={r"/*": {"origins": "http://localhost:5173"}})
+    # Prometheus-text metrics at /metrics; first, so requests rejected by later hooks are timed too
+    app.config["METRICS_TOKEN"] = os.getenv("METRICS_TOKEN")
+    metrics.init_app(app)
+    # Per-route / per-blueprint limits (RATE_LIMITS); "database" backend shares counters across processes
+    app.config["RATE_LIMIT_BACKEND"] = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    rate_limiter.init_app(app)
+    # Per-request query count/time and N+1 suspects (headers + log line; on by default in debug)
+    if os.getenv("SQL_STATS_HEADERS"):
+        app.config["SQL_STATS_HEADERS"] = os.getenv("SQL_STATS_HEADERS").lower() == "true"
+    if os.getenv("SQL_STATS_LOG"):
+        app.config["SQL_STATS_LOG"] = os.getenv("SQL_STATS_LOG").lower() == "true"
+    query_stats.init_app(app)
+    CORS(app, resources={r"/*": {"origins": "http://localhost:5173"}}, expose_headers=[db_routing.LAST_WRITE_HEADER])
 
     with app.app_context():
         register_routes(app)
+    register_commands(app)
     
     return app
\ No newline at end of file
@@ -0,0 +1,164 @@
+# RENTAL_CAR/app/cli.py
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import click
+from sqlalchemy import func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.models import db, Booking, BookingStatus, Car, CarUnit, Coupon, Notification
+from app.schemas import BookingSchema, NotificationSchema
+from app.utils.projection import projected_schema
+from app.utils.serializers import dump_rows
+
+
+class explain(Executable, ClauseElement):
+    """EXPLAIN wrapper around a select(), rendered for the active dialect."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = "EXPLAIN QUERY PLAN " if compiler.dialect.name == "sqlite" else "EXPLAIN "
+    return prefix + compiler.process(element.statement, **kw)
+
+
+def hot_queries():
+    """
+    The statements that run on every booking, expiry sweep and bell poll.
+    Parameter values are arbitrary; only the plan shape matters.
+    """
+    now = datetime.utcnow()
+    return {
+        "availability_overlap": select(func.count(Booking.id)).where(
+            Booking.car_id == 1,
+            Booking.status.in_(BookingStatus.BLOCKING),
+            Booking.start_time < now + timedelta(days=2),
+            Booking.end_time > now,
+        ),
+        "pending_expiry": select(Booking.id).where(
+            Booking.status == BookingStatus.PENDING,
+            Booking.created_at <= now - timedelta(minutes=5),
+        ),
+        "user_bookings": select(Booking.id)
+        .where(Booking.user_id == 1)
+        .order_by(Booking.created_at.desc()),
+        "user_notifications": select(Notification.id)
+        .where(Notification.user_id == 1)
+        .order_by(Notification.created_at.desc())
+        .limit(50),
+        "unread_count": select(func.count(Notification.id)).where(
+            Notification.user_id == 1,
+            Notification.is_read == False,
+        ),
+    }
+
+
+def full_scans(session, statement):
+    """Returns the plan lines that read a whole table instead of an index."""
+    rows = session.execute(explain(statement)).all()
+    if session.get_bind().dialect.name == "sqlite":
+        # (id, parent, notused, detail) e.g. "SCAN bookings" vs "SEARCH bookings USING INDEX ..."
+        return [row[-1] for row in rows if row[-1].startswith("SCAN") and "INDEX" not in row[-1]]
+    # MySQL: access type "ALL" is a full table scan.
+    return [
+        f"{row._mapping['table']}: type=ALL"
+        for row in rows
+        if row._mapping.get("type") == "ALL"
+    ]
+
+
+def plan_regressions(session):
+    """{name: full-scan plan lines} for every hot query; an empty list means it uses an index."""
+    return {name: full_scans(session, statement) for name, statement in hot_queries().items()}
+
+
+def sample_rows(count):
+    """
+    In-memory (never flushed) rows shaped like the hot list responses:
+    bookings with car/unit/coupon attached, and notification Row-like tuples.
+    """
+    now = datetime(2025, 1, 1, 10, 30)
+    car = Car(
+        id=1, brand="Toyota", name="Fortuner", slug="toyota-fortuner", category_id=1,
+        quantity=2, seats=5, doors=4, transmission="AUTO", fuel_type="Diesel",
+        daily_rate=Decimal("100.00"), twelve_hour_rate=Decimal("60.00"), cleaning_time=2,
+        status="AVAILABLE", is_featured=False, created_at=now,
+    )
+    unit = CarUnit(id=1, car_id=1, number_plate="KA01AB1234", status=CarUnit.ACTIVE, created_at=now)
+    coupon = Coupon(
+        id=1, code="SAVE10", discount_percentage=Decimal("10.00"), valid_from=now,
+        valid_to=now + timedelta(days=30), usage_limit=100, usage_count=3, active=True,
+    )
+    bookings = [
+        Booking(
+            id=i, user_id=i % 50, car_id=1, unit_id=1, coupon_id=1 if i % 3 == 0 else None,
+            start_time=now + timedelta(hours=i), end_time=now + timedelta(hours=i + 30),
+            total_price=Decimal("180.00"), status=BookingStatus.APPROVED, created_at=now,
+            car=car, unit=unit, coupon=coupon if i % 3 == 0 else None,
+        )
+        for i in range(count)
+    ]
+    Row = namedtuple("Row", [name for name in NotificationSchema().dump_fields])
+    notifications = [
+        Row(id=i, user_id=i % 50, booking_id=i, message=f"Booking #{i} approved",
+            is_read=bool(i % 2), created_at=now)
+        for i in range(count)
+    ]
+    return bookings, notifications
+
+
+def rows_per_second(fn, rows, repeat):
+    best = min(_timed(fn, rows) for _ in range(repeat))
+    return len(rows) / best
+
+
+def _timed(fn, rows):
+    started = time.perf_counter()
+    fn(rows)
+    return time.perf_counter() - started
+
+
+def register_commands(app):
+    @app.cli.command("check-query-plans")
+    def check_query_plans():
+        """Fails if any hot query regresses to a full table scan."""
+        failures = 0
+        for name, scans in plan_regressions(db.session).items():
+            if scans:
+                failures += 1
+                click.echo(f"FAIL {name}: {'; '.join(scans)}")
+            else:
+                click.echo(f"ok   {name}")
+
+        if failures:
+            raise SystemExit(1)
+
+    @app.cli.command("bench-serializers")
+    @click.option("--rows", default=5000, show_default=True)
+    @click.option("--repeat", default=5, show_default=True)
+    def bench_serializers(rows, repeat):
+        """Rows/second of schema.dump() vs the compiled serializers (equality: tests/test_serializers.py)."""
+        bookings, notifications = sample_rows(rows)
+        cases = {
+            "bookings (full)": (BookingSchema(many=True), bookings),
+            "bookings (list default)": (
+                projected_schema(BookingSchema, tuple(sorted(set(BookingSchema().dump_fields) - {"unit", "coupon"}))),
+                bookings,
+            ),
+            "notifications (rows)": (NotificationSchema(many=True), notifications),
+        }
+        for name, (schema, sample) in cases.items():
+            before = rows_per_second(schema.dump, sample, repeat)
+            after = rows_per_second(lambda items: dump_rows(schema, items), sample, repeat)
+            click.echo(
+                f"{name:26} marshmallow {before:>10,.0f} rows/s   compiled {after:>10,.0f} rows/s"
+                f"   x{after / before:.1f}"
+            )
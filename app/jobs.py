@@ -0,0 +1,107 @@
+# RENTAL_CAR/app/jobs.py
+"""
+Periodic background jobs.
+
+Web workers never start these. They run from the dedicated entry point
+(`python jobs.py`), or next to the dev server in `python run.py`. Each runner
+competes for the "job-runner" lease, and only the lease holder executes jobs,
+so starting several runners is safe: the others stay on standby.
+"""
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from app.models import db
+from app.services import invalidation
+from app.services.expiry_service import MIN_RESCHEDULE, expire_pending_bookings, next_run_at
+from app.services.job_runner import LEASE_TTL, LeaderLease, run_recorded
+from app.utils.rate_limit import DatabaseBackend, rate_limiter
+
+LEASE_NAME = "job-runner"
+HEARTBEAT = LEASE_TTL / 3
+
+
+class JobRunner:
+    def __init__(self, app, scheduler_cls=BlockingScheduler):
+        self.app = app
+        self.lease = LeaderLease(LEASE_NAME)
+        self.scheduler = scheduler_cls()
+
+        now = datetime.now(timezone.utc)
+        self.scheduler.add_job(func=self.heartbeat, trigger="interval", seconds=HEARTBEAT.total_seconds(),
+                               id="heartbeat", next_run_time=now)
+        self.scheduler.add_job(func=self.auto_reject_bookings, id="auto_reject_bookings",
+                               next_run_time=now + timedelta(seconds=1))
+        self.scheduler.add_job(func=self.prune_invalidation_log, trigger="interval", minutes=10,
+                               id="prune_invalidation_log")
+        if isinstance(rate_limiter.backend, DatabaseBackend):
+            self.scheduler.add_job(func=self.prune_rate_limit_counters, trigger="interval", minutes=10,
+                                   id="prune_rate_limit_counters")
+
+    def start(self):
+        self.scheduler.start()
+
+    def shutdown(self):
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        with self.app.app_context():
+            try:
+                self.lease.release(db.session)
+            except Exception:
+                db.session.rollback()
+
+    def heartbeat(self):
+        with self.app.app_context():
+            was_leader = self.lease.is_held()
+            try:
+                leader = self.lease.acquire(db.session)
+            except Exception as e:
+                db.session.rollback()
+                print(f"[JOBS] Lease renewal failed: {e}")
+                return
+            if leader and not was_leader:
+                print(f"[JOBS] {self.lease.holder} is now the job runner.")
+
+    def auto_reject_bookings(self):
+        # Standby runners just check back after the next heartbeat.
+        next_run = datetime.utcnow() + HEARTBEAT
+        if self.lease.is_held():
+            with self.app.app_context():
+                try:
+                    expired, has_more = run_recorded(
+                        db.session, "auto_reject_bookings", lambda: expire_pending_bookings(db.session)
+                    )
+                    if expired:
+                        print(f"[AUTO-REJECT] {expired} pending booking(s) expired.")
+
+                    # Run again at the next booking's deadline instead of on a fixed tick.
+                    next_run = datetime.utcnow() + MIN_RESCHEDULE if has_more else next_run_at(db.session)
+                except Exception as e:
+                    print(f"[AUTO-REJECT] Expiry run failed: {e}")
+                    next_run = datetime.utcnow() + MIN_RESCHEDULE
+
+        self.scheduler.add_job(
+            func=self.auto_reject_bookings,
+            trigger="date",
+            run_date=next_run.replace(tzinfo=timezone.utc),
+            id="auto_reject_bookings",
+            replace_existing=True,
+        )
+
+    def prune_invalidation_log(self):
+        if not self.lease.is_held():
+            return
+        with self.app.app_context():
+            try:
+                run_recorded(db.session, "prune_invalidation_log", lambda: invalidation.prune(db.session))
+            except Exception as e:
+                print(f"[JOBS] Pruning invalidation log failed: {e}")
+
+    def prune_rate_limit_counters(self):
+        if not self.lease.is_held():
+            return
+        with self.app.app_context():
+            try:
+                run_recorded(db.session, "prune_rate_limit_counters", rate_limiter.backend.prune)
+            except Exception as e:
+                print(f"[JOBS] Pruning rate limit counters failed: {e}")
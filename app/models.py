@@ -1,14 +1,15 @@
 # RENTAL_CAR/app/models.py
 from datetime import datetime
-from decimal import Decimal
-import math
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import CheckConstraint, DateTime, Enum, event
-from sqlalchemy.orm import validates
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import CheckConstraint, DateTime, Enum, Index, event, inspect
+from sqlalchemy.orm import object_session, validates
+from app.services.password_hashing import hash_password, needs_rehash, verify_password
+from app.services.pricing import PRICING_VERSION, apply_coupon, coupon_applies, coupon_terms, from_cents, quote_cents, rate_card
+from app.utils.db_routing import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession sends GET-request reads to the "replica" bind when one is configured.
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 class BookingStatus:
@@ -72,6 +73,7 @@ class Car(db.Model):
 
     category = db.relationship("Category", back_populates="cars")
     bookings = db.relationship("Booking", back_populates="car", cascade="all, delete-orphan")
+    units = db.relationship("CarUnit", back_populates="car", cascade="all, delete-orphan")
 
     __table_args__ = (
         CheckConstraint("quantity >= 1", name="ck_cars_quantity_positive"),
@@ -81,6 +83,34 @@ class Car(db.Model):
         return f"<Car {self.brand} {self.name}>"
 
 
+class CarUnit(db.Model):
+    """
+    One physical vehicle of a Car model. Car.quantity mirrors the number of
+    ACTIVE units; bookings are allocated (and locked) per unit.
+    """
+    __tablename__ = "car_units"
+
+    ACTIVE = "ACTIVE"
+    RETIRED = "RETIRED"
+
+    id = db.Column(db.Integer, primary_key=True)
+    car_id = db.Column(db.Integer, db.ForeignKey("cars.id"), nullable=False, index=True)
+    number_plate = db.Column(db.String(20), unique=True)
+    status = db.Column(db.String(20), nullable=False, default=ACTIVE)
+    created_at = db.Column(DateTime, default=datetime.utcnow)
+
+    car = db.relationship("Car", back_populates="units")
+    bookings = db.relationship("Booking", back_populates="unit")
+
+    def __repr__(self) -> str:  # pragma: no cover - repr convenience
+        return f"<CarUnit {self.id} of car {self.car_id}>"
+
+
+def normalize_coupon_code(code: str | None) -> str:
+    """Coupon codes are stored and looked up stripped and upper-cased."""
+    return (code or "").strip().upper()
+
+
 class Coupon(db.Model):
     __tablename__ = "coupons"
 
@@ -95,6 +125,10 @@ class Coupon(db.Model):
 
     bookings = db.relationship("Booking", back_populates="coupon")
 
+    @validates("code")
+    def _normalize_code(self, key, value):
+        return normalize_coupon_code(value) if value is not None else None
+
     def is_valid_for_use(self, reference_time: datetime | None = None) -> bool:
         ref = reference_time or datetime.utcnow()
         return (
@@ -113,11 +147,17 @@ class Booking(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     car_id = db.Column(db.Integer, db.ForeignKey("cars.id"), nullable=False)
+    unit_id = db.Column(db.Integer, db.ForeignKey("car_units.id"))
     coupon_id = db.Column(db.Integer, db.ForeignKey("coupons.id"))
 
     start_time = db.Column(DateTime, nullable=False)
     end_time = db.Column(DateTime, nullable=False)
     total_price = db.Column(db.Numeric(10, 2))
+    # Inputs total_price was computed from, so later rate/coupon edits don't change history.
+    pricing_version = db.Column(db.Integer)
+    rate_twelve_hour = db.Column(db.Numeric(10, 2))
+    rate_daily = db.Column(db.Numeric(10, 2))
+    discount_percentage = db.Column(db.Numeric(5, 2))
     status = db.Column(
         Enum(*BookingStatus.ALL, name="booking_status"),
         nullable=False,
@@ -128,11 +168,22 @@ class Booking(db.Model):
 
     user = db.relationship("User", back_populates="bookings")
     car = db.relationship("Car", back_populates="bookings")
+    unit = db.relationship("CarUnit", back_populates="bookings")
     coupon = db.relationship("Coupon", back_populates="bookings")
     notifications = db.relationship("Notification", back_populates="booking", cascade="all, delete-orphan")
 
     __table_args__ = (
         CheckConstraint("end_time > start_time", name="ck_bookings_time_order"),
+        # Availability overlap checks: car + status equality, then the time range.
+        Index("ix_bookings_car_status_window", "car_id", "status", "start_time", "end_time"),
+        # Expiry sweep of PENDING bookings by age.
+        Index("ix_bookings_status_created", "status", "created_at"),
+        # Per-user booking history, newest first.
+        Index("ix_bookings_user_created", "user_id", "created_at"),
+        # Admin booking list, newest first (keyset pagination on created_at, id).
+        Index("ix_bookings_created", "created_at"),
+        # Per-unit conflict check while allocating a vehicle.
+        Index("ix_bookings_unit_window", "unit_id", "start_time", "end_time"),
     )
 
     @validates("status")
@@ -159,10 +210,77 @@ class Notification(db.Model):
     user = db.relationship("User", back_populates="notifications")
     booking = db.relationship("Booking", back_populates="notifications")
 
+    __table_args__ = (
+        # Notification bell polling: latest notifications of one user.
+        Index("ix_notifications_user_created", "user_id", "created_at"),
+        # Unread badge count and "mark all read".
+        Index("ix_notifications_user_read", "user_id", "is_read"),
+    )
+
     def __repr__(self) -> str:  # pragma: no cover - repr convenience
         return f"<Notification {self.id} to user {self.user_id}>"
 
 
+class InvalidationEvent(db.Model):
+    """
+    Append-only log of cache invalidations, so every worker process can drop
+    its in-memory copies after another process changes the underlying rows.
+    """
+    __tablename__ = "invalidation_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    topic = db.Column(db.String(50), nullable=False)
+    key = db.Column(db.String(100))
+    created_at = db.Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - repr convenience
+        return f"<InvalidationEvent {self.topic}:{self.key}>"
+
+
+class JobLease(db.Model):
+    """
+    Leader election for background jobs: whoever holds the unexpired lease
+    row is the only process allowed to run periodic jobs.
+    """
+    __tablename__ = "job_leases"
+
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(150), nullable=False)
+    expires_at = db.Column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover - repr convenience
+        return f"<JobLease {self.name} held by {self.holder}>"
+
+
+class JobStat(db.Model):
+    """Last-run bookkeeping for each background job."""
+    __tablename__ = "job_stats"
+
+    name = db.Column(db.String(100), primary_key=True)
+    last_started_at = db.Column(DateTime)
+    last_success_at = db.Column(DateTime)
+    last_duration_ms = db.Column(db.Integer)
+    last_rows = db.Column(db.Integer)
+    last_error = db.Column(db.String(255))
+    run_count = db.Column(db.Integer, nullable=False, default=0)
+    failure_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:  # pragma: no cover - repr convenience
+        return f"<JobStat {self.name}>"
+
+
+class RateLimitCounter(db.Model):
+    """Shared request counters for the database rate-limit backend (one row per key and window)."""
+    __tablename__ = "rate_limit_counters"
+
+    key = db.Column(db.String(200), primary_key=True)
+    window_index = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:  # pragma: no cover - repr convenience
+        return f"<RateLimitCounter {self.key}@{self.window_index}={self.count}>"
+
+
 class User(db.Model):
     __tablename__ = "users"
 
@@ -170,16 +288,22 @@ class User(db.Model):
     username = db.Column(db.String(150), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
-    created_at = db.Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Bumped whenever privileges change; tokens carrying an older "tv" claim are stale.
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    created_at = db.Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
 
     bookings = db.relationship("Booking", back_populates="user", cascade="all, delete-orphan")
     notifications = db.relationship("Notification", back_populates="user", cascade="all, delete-orphan")
 
+    # Both run on the bounded hashing pool and may raise HashingBusy.
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
+        return needs_rehash(self.password_hash)
 
     def __repr__(self) -> str:  # pragma: no cover
         return f"<User {self.username}>"
@@ -188,32 +312,52 @@ class User(db.Model):
 def calculate_total_price(booking: Booking) -> None:
     """
     Port of Django's Booking.save pricing rules, with coupon support.
-    Expects booking.car, booking.start_time, booking.end_time to be set.
+    Expects booking.start_time, booking.end_time and booking.car (or car_id) to be set.
+    The arithmetic lives in app/services/pricing.py so quotes and bookings agree.
+    Also snapshots the rates and discount used.
     """
-    if not booking.start_time or not booking.end_time or not booking.car:
+    car = _related(booking, "car", Car, booking.car_id)
+    if not booking.start_time or not booking.end_time or not car:
         return
+    coupon = _related(booking, "coupon", Coupon, booking.coupon_id)
 
-    diff = booking.end_time - booking.start_time
-    total_hours = diff.total_seconds() / 3600
+    card = rate_card(car)
+    base_cents = quote_cents(card, booking.start_time, booking.end_time)
+
+    # The booking's own coupon is already redeemed, so its usage limit no longer applies.
+    terms = coupon_terms(coupon, redeemed=True) if coupon is not None else None
+    total_cents = apply_coupon(base_cents, terms, booking.start_time)
+    discount = coupon.discount_percentage if coupon_applies(terms, booking.start_time) else None
+
+    booking.total_price = from_cents(total_cents)
+    booking.pricing_version = PRICING_VERSION
+    booking.rate_twelve_hour = from_cents(card.twelve_hour_cents)
+    booking.rate_daily = from_cents(card.daily_cents)
+    booking.discount_percentage = discount
+
+
+def _related(booking: Booking, name: str, model, key):
+    """
+    booking.<name>, or the row for its foreign key. A pending booking that only
+    has the id set does not lazy-load the relationship during its INSERT.
+    """
+    value = getattr(booking, name)
+    if value is None and key is not None:
+        session = object_session(booking)
+        if session is not None:
+            with session.no_autoflush:
+                value = session.get(model, key)
+    return value
 
-    if total_hours <= 0:
-        total_hours = 1
 
-    if total_hours <= 12:
-        base_price = Decimal(booking.car.twelve_hour_rate)
-    elif total_hours <= 24:
-        base_price = Decimal(booking.car.daily_rate)
-    else:
-        days = math.ceil(total_hours / 24)
-        base_price = Decimal(booking.car.daily_rate) * days
+# Changing any of these re-prices a booking; anything else (status, unit) keeps the stored price.
+PRICED_ATTRIBUTES = ("start_time", "end_time", "car_id", "coupon_id", "car", "coupon")
 
-    # Apply coupon if present and valid
-    if booking.coupon and booking.coupon.is_valid_for_use(booking.start_time):
-        discount_pct = Decimal(booking.coupon.discount_percentage)
-        discount = (discount_pct / Decimal("100")) * base_price
-        base_price = base_price - discount
 
-    booking.total_price = max(base_price, Decimal("0.00"))
+def pricing_inputs_changed(booking: Booking) -> bool:
+    # History of an unloaded relationship is empty, so this never triggers a lazy load.
+    attrs = inspect(booking).attrs
+    return any(attrs[name].history.has_changes() for name in PRICED_ATTRIBUTES)
 
 
 @event.listens_for(Booking, "before_insert")
@@ -223,5 +367,6 @@ def booking_before_insert(mapper, connection, target: Booking):  # pragma: no co
 
 @event.listens_for(Booking, "before_update")
 def booking_before_update(mapper, connection, target: Booking):  # pragma: no cover - runtime hook
-    # Only recalc when relevant fields change; SQLAlchemy will provide history.
-    calculate_total_price(target)
\ No newline at end of file
+    # Bookings never priced (total_price NULL) are priced on their next update.
+    if target.total_price is None or pricing_inputs_changed(target):
+        calculate_total_price(target)
@@ -4,10 +4,12 @@ from .bookings import bp as bookings_bp
 from .admin import bp as admin_bp
 from .public import bp as public_bp
 from .notifications import bp as notifications_bp
+from .events import bp as events_bp
 
 def register_routes(app):
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(bookings_bp, url_prefix="/bookings")
     app.register_blueprint(admin_bp, url_prefix="/admin")
     app.register_blueprint(public_bp, url_prefix="/public")
-    app.register_blueprint(notifications_bp, url_prefix="/notifications")
\ No newline at end of file
+    app.register_blueprint(notifications_bp, url_prefix="/notifications")
+    app.register_blueprint(events_bp, url_prefix="/events")
\ No newline at end of file
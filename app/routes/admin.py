@@ -1,21 +1,29 @@
 # RENTAL_CAR/app/routes/admin.py
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import db, Car, Coupon, Booking, BookingStatus, User, Category
-from app.routes.utils import admin_required
-from app.schemas import CarSchema, CouponSchema, BookingSchema, UserSchema, CategorySchema
+from app.models import db, Car, CarUnit, Coupon, Booking, BookingStatus, User, Category, JobLease, JobStat
+from app.routes.utils import admin_required, booking_filters
+from app.schemas import CarSchema, CarUnitSchema, CouponSchema, BookingSchema, UserSchema, CategorySchema
+from app.services.fleet_service import FleetError, active_unit_count, normalize_plate, retire_unit, sync_car_units
+from app.services.auth_cache import user_changed
+from app.services.catalog_cache import CARS, COUPONS, catalog_changed
+from app.services.user_stats import user_stats_columns
+from app.services.password_hashing import get_pool as get_hashing_pool
+from app.services.events import booking_changed
+from app.services.occupancy_index import mark_car_changed
+from app.utils.pagination import ListArgumentError, page_meta, paginate, parse_bool, parse_choices, parse_int
+from app.utils.projection import projection
 from app.utils.responses import ok, error
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
 
 bp = Blueprint("admin", __name__, url_prefix="/admin")
 
 # Initialize Schemas
 car_schema = CarSchema()
-cars_schema = CarSchema(many=True)
+unit_schema = CarUnitSchema()
+units_schema = CarUnitSchema(many=True)
 coupon_schema = CouponSchema()
-coupons_schema = CouponSchema(many=True)
 booking_schema = BookingSchema()
-bookings_schema = BookingSchema(many=True)
 user_schema = UserSchema()
 users_schema = UserSchema(many=True)
 categories_schema = CategorySchema(many=True) # ✅ Added CategorySchema
@@ -41,8 +49,23 @@ def list_categories():
 @jwt_required()
 @admin_required
 def list_cars():
-    cars = Car.query.order_by(Car.created_at.desc()).all()
-    return ok({"items": cars_schema.dump(cars)}, 200)
+    """
+    Paginated (see app/utils/pagination.py). Filters: status (comma-separated), category_id.
+    Projection (see app/utils/projection.py): fields, include=category.
+    """
+    try:
+        projected = projection(request.args, CarSchema)
+        query = Car.query.options(*projected.loader_options())
+        statuses = parse_choices(request.args, "status")
+        if statuses:
+            query = query.filter(Car.status.in_(statuses))
+        category_id = parse_int(request.args, "category_id")
+        if category_id is not None:
+            query = query.filter(Car.category_id == category_id)
+        page = paginate(query, (Car.created_at, Car.id), request.args)
+    except ListArgumentError as e:
+        return error(str(e), 400)
+    return ok({"items": projected.dump(page.items), **page_meta(page)}, 200)
 
 @bp.post("/cars")
 @jwt_required()
@@ -55,6 +78,9 @@ def create_car():
         # Validate and Load
         car = car_schema.load(payload)
         db.session.add(car)
+        db.session.flush()
+        sync_car_units(db.session, car)
+        catalog_changed(db.session, CARS)
         db.session.commit()
         return ok({"car": car_schema.dump(car)}, 201)
     except Exception as e:
@@ -84,8 +110,15 @@ def update_car(car_id):
     if 'category_id' in payload: car.category_id = int(payload['category_id']) # ✅ Added category update
 
     try:
+        if 'quantity' in payload:
+            sync_car_units(db.session, car)
+            mark_car_changed(db.session, car.id)
+        catalog_changed(db.session, CARS)
         db.session.commit()
         return ok({"car": car_schema.dump(car)}, 200)
+    except FleetError as e:
+        db.session.rollback()
+        return error(str(e), 409)
     except Exception as e:
         db.session.rollback()
         return error(str(e), 400)
@@ -97,6 +130,8 @@ def delete_car(car_id):
     car = Car.query.get(car_id)
     if not car: return error("Car not found", 404)
     try:
+        mark_car_changed(db.session, car.id)
+        catalog_changed(db.session, CARS)
         db.session.delete(car)
         db.session.commit()
         return ok({"message": "Car deleted"}, 200)
@@ -104,30 +139,68 @@ def delete_car(car_id):
         db.session.rollback()
         return error(f"Error deleting car: {str(e)}", 500)
 
+# --- UNIT (PHYSICAL VEHICLE) MANAGEMENT ---
+
+@bp.get("/cars/<int:car_id>/units")
+@jwt_required()
+@admin_required
+def list_car_units(car_id):
+    units = CarUnit.query.filter_by(car_id=car_id).order_by(CarUnit.id).all()
+    return ok({"items": units_schema.dump(units)}, 200)
+
+@bp.patch("/units/<int:unit_id>")
+@jwt_required()
+@admin_required
+def update_car_unit(unit_id):
+    unit = CarUnit.query.get(unit_id)
+    if not unit: return error("Unit not found", 404)
+
+    payload = request.get_json(silent=True) or {}
+    if 'number_plate' in payload: unit.number_plate = normalize_plate(payload['number_plate'])
+    if 'status' in payload:
+        if payload['status'] not in (CarUnit.ACTIVE, CarUnit.RETIRED):
+            return error(f"Invalid status. Must be {CarUnit.ACTIVE} or {CarUnit.RETIRED}", 400)
+        if payload['status'] == CarUnit.RETIRED:
+            try:
+                retire_unit(db.session, unit)
+            except FleetError as e:
+                db.session.rollback()
+                return error(str(e), 409)
+        else:
+            unit.status = CarUnit.ACTIVE
+
+    try:
+        db.session.flush()
+        # Car.quantity mirrors the number of ACTIVE units (never 0: the last one can't be retired).
+        unit.car.quantity = active_unit_count(db.session, unit.car_id)
+        mark_car_changed(db.session, unit.car_id)
+        db.session.commit()
+        return ok({"unit": unit_schema.dump(unit)}, 200)
+    except Exception as e:
+        db.session.rollback()
+        return error(f"Error updating unit: {str(e)}", 400)
+
 # --- BOOKING MANAGEMENT ---
 
 @bp.get("/bookings")
 @jwt_required()
 @admin_required
 def list_all_bookings():
+    """
+    Paginated (see app/utils/pagination.py).
+    Filters: status (comma-separated), car_id, user_id, from/to (overlapping window).
+    Projection (see app/utils/projection.py): fields, include=car,unit,coupon (default car).
+    """
+    # Expired PENDING bookings are cancelled by the auto_reject_bookings job
+    # (app/jobs.py, app/services/expiry_service.py), not here.
     try:
-        now_utc = datetime.now(timezone.utc)
-        expiration_threshold = now_utc - timedelta(minutes=1)
-        
-        # Expire old pending bookings
-        expired_bookings = Booking.query.filter(
-            Booking.status == BookingStatus.PENDING,
-            Booking.created_at < expiration_threshold.replace(tzinfo=None)
-        ).all()
-
-        if expired_bookings:
-            for booking in expired_bookings:
-                booking.status = BookingStatus.CANCELLED
-            db.session.commit()
-
-        bookings = Booking.query.order_by(Booking.created_at.desc()).all()
-        return ok({"items": bookings_schema.dump(bookings)}, 200)
+        projected = projection(request.args, BookingSchema, default_include=("car",))
+        query = Booking.query.options(*projected.loader_options()).filter(*booking_filters(request.args))
+        page = paginate(query, (Booking.created_at, Booking.id), request.args)
+        return ok({"items": projected.dump(page.items), **page_meta(page)}, 200)
 
+    except ListArgumentError as e:
+        return error(str(e), 400)
     except Exception as e:
         return error(f"Failed to fetch bookings: {str(e)}", 500)
 
@@ -146,6 +219,8 @@ def update_booking_status(booking_id: int):
 
     try:
         booking.status = new_status
+        mark_car_changed(db.session, booking.car_id)
+        booking_changed(db.session, booking.id)
         db.session.commit()
         return ok({"booking": booking_schema.dump(booking)}, 200)
     except Exception as e:
@@ -159,6 +234,8 @@ def delete_booking(booking_id):
     booking = Booking.query.get(booking_id)
     if not booking: return error("Booking not found", 404)
     try:
+        mark_car_changed(db.session, booking.car_id)
+        booking_changed(db.session, booking.id)
         db.session.delete(booking)
         db.session.commit()
         return ok({"message": "Booking deleted"}, 200)
@@ -173,22 +250,77 @@ def delete_booking(booking_id):
 @admin_required
 def list_users():
     """
-    Lists all users with their total booking count.
+    Lists users with their booking stats (total_bookings, last_booking_at,
+    lifetime_spend), all from one query.
+    Paginated (see app/utils/pagination.py). Filter: is_admin.
+    Sorting: sort=created_at|total_bookings|last_booking_at|lifetime_spend, order=desc|asc.
+    Projection (see app/utils/projection.py): fields (user columns; stats are always included).
     """
     try:
-        users = User.query.all()
+        projected = projection(request.args, UserSchema)
+        stats = user_stats_columns()
+        sort = request.args.get("sort", "created_at")
+        if sort != "created_at" and sort not in stats:
+            return error(f"sort must be one of created_at, {', '.join(stats)}", 400)
+        order = request.args.get("order", "desc")
+        if order not in ("asc", "desc"):
+            return error("order must be asc or desc", 400)
+
+        query = db.session.query(User, *stats.values())
+        is_admin = parse_bool(request.args, "is_admin")
+        if is_admin is not None:
+            query = query.filter(User.is_admin == is_admin)
+
+        sort_column = User.created_at if sort == "created_at" else stats[sort]
+        page = paginate(
+            query, (sort_column, User.id), request.args,
+            descending=order == "desc",
+            key=lambda row: (row.User.created_at if sort == "created_at" else getattr(row, sort), row.User.id),
+        )
         
         users_data = []
-        for user in users:
-            booking_count = Booking.query.filter_by(user_id=user.id).count()
-            user_dump = user_schema.dump(user)
-            user_dump['total_bookings'] = booking_count 
+        user_dumps = projected.dump([row.User for row in page.items])
+        for row, user_dump in zip(page.items, user_dumps):
+            user_dump['total_bookings'] = row.total_bookings
+            user_dump['last_booking_at'] = row.last_booking_at.isoformat() if row.last_booking_at else None
+            user_dump['lifetime_spend'] = str(row.lifetime_spend)
             users_data.append(user_dump)
 
-        return ok({"items": users_data}, 200)
+        return ok({"items": users_data, **page_meta(page)}, 200)
+    except ListArgumentError as e:
+        return error(str(e), 400)
     except Exception as e:
         return error(f"Failed to fetch users: {str(e)}", 500)
 
+@bp.patch("/users/<int:user_id>")
+@jwt_required()
+@admin_required
+def update_user(user_id):
+    """
+    Grant or revoke admin rights: {"is_admin": true|false}.
+    Existing tokens of that user stop working for admin routes.
+    """
+    user = User.query.get(user_id)
+    if not user:
+        return error("User not found", 404)
+
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload.get("is_admin"), bool):
+        return error("is_admin (true/false) is required", 400)
+    if str(user.id) == str(get_jwt_identity()) and not payload["is_admin"]:
+        return error("You cannot remove your own admin rights.", 400)
+
+    try:
+        if user.is_admin != payload["is_admin"]:
+            user.is_admin = payload["is_admin"]
+            user.token_version = (user.token_version or 0) + 1
+            user_changed(db.session, user.id)
+        db.session.commit()
+        return ok({"user": user_schema.dump(user)}, 200)
+    except Exception as e:
+        db.session.rollback()
+        return error(f"Failed to update user: {str(e)}", 500)
+
 @bp.delete("/users/<int:user_id>")
 @jwt_required()
 @admin_required
@@ -199,9 +331,19 @@ def delete_user(user_id):
     
     try:
         current_user_id = get_jwt_identity()
-        if user.id == current_user_id:
+        if str(user.id) == str(current_user_id):
             return error("You cannot delete your own admin account.", 400)
 
+        user_changed(db.session, user.id)
+        # The cascade removes their bookings; free those cars in every process's occupancy index.
+        car_ids = {
+            car_id for (car_id,) in db.session.query(Booking.car_id).filter(
+                Booking.user_id == user.id,
+                Booking.status.in_(BookingStatus.BLOCKING),
+            ).distinct()
+        }
+        for car_id in car_ids:
+            mark_car_changed(db.session, car_id)
         db.session.delete(user)
         db.session.commit()
         return ok({"message": "User deleted successfully"}, 200)
@@ -215,8 +357,20 @@ def delete_user(user_id):
 @jwt_required()
 @admin_required
 def list_coupons():
-    coupons = Coupon.query.order_by(Coupon.id.desc()).all()
-    return ok({"items": coupons_schema.dump(coupons)}, 200)
+    """
+    Paginated by id (see app/utils/pagination.py). Filter: active.
+    Projection (see app/utils/projection.py): fields.
+    """
+    try:
+        projected = projection(request.args, CouponSchema)
+        query = Coupon.query
+        active = parse_bool(request.args, "active")
+        if active is not None:
+            query = query.filter(Coupon.active == active)
+        page = paginate(query, (Coupon.id,), request.args)
+    except ListArgumentError as e:
+        return error(str(e), 400)
+    return ok({"items": projected.dump(page.items), **page_meta(page)}, 200)
 
 @bp.post("/coupons")
 @jwt_required()
@@ -240,6 +394,7 @@ def create_coupon():
         )
         
         db.session.add(coupon)
+        catalog_changed(db.session, COUPONS)
         db.session.commit()
         return ok({"coupon": coupon_schema.dump(coupon)}, 201)
     except Exception as e:
@@ -264,6 +419,7 @@ def update_coupon(coupon_id):
         if 'valid_to' in payload and payload['valid_to']:
              coupon.valid_to = datetime.fromisoformat(payload['valid_to'].replace('Z', ''))
 
+        catalog_changed(db.session, COUPONS)
         db.session.commit()
         return ok({"coupon": coupon_schema.dump(coupon)}, 200)
     except Exception as e:
@@ -278,8 +434,49 @@ def delete_coupon(coupon_id):
     if not c: return error("Not found", 404)
     try:
         db.session.delete(c)
+        catalog_changed(db.session, COUPONS)
         db.session.commit()
         return ok({"message": "Deleted"}, 200)
     except Exception as e:
         db.session.rollback()
-        return error(str(e), 500)
\ No newline at end of file
+        return error(str(e), 500)
+
+# --- BACKGROUND JOBS ---
+
+@bp.get("/jobs")
+@jwt_required()
+@admin_required
+def list_jobs():
+    """
+    Last run of each background job, plus which process currently holds the runner lease.
+    """
+    def iso(value):
+        return value.isoformat() if value else None
+
+    items = [
+        {
+            "name": stat.name,
+            "last_started_at": iso(stat.last_started_at),
+            "last_success_at": iso(stat.last_success_at),
+            "last_duration_ms": stat.last_duration_ms,
+            "last_rows": stat.last_rows,
+            "last_error": stat.last_error,
+            "run_count": stat.run_count,
+            "failure_count": stat.failure_count,
+        }
+        for stat in JobStat.query.order_by(JobStat.name).all()
+    ]
+    leases = [
+        {"name": lease.name, "holder": lease.holder, "expires_at": iso(lease.expires_at)}
+        for lease in JobLease.query.all()
+    ]
+    return ok({"items": items, "leases": leases}, 200)
+
+@bp.get("/metrics/hashing")
+@jwt_required()
+@admin_required
+def hashing_metrics():
+    """
+    Password hashing pool: completed/rejected counts, hash time and queue wait (seconds).
+    """
+    return ok({"hashing": get_hashing_pool().stats()}, 200)
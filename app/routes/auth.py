@@ -4,11 +4,16 @@ from flask import Blueprint, request
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from app.models import db, User
 from app.schemas import UserSchema
+from app.services.auth_cache import auth_cache, context_to_dict
+from app.services.password_hashing import HashingBusy
 from app.utils.responses import ok, error
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 user_schema = UserSchema()
 
+def busy_error():
+    return error("Server is busy, please try again in a moment", 503, headers={"Retry-After": "1"})
+
 # ✅ STRONG PASSWORD VALIDATOR
 def is_strong_password(password):
     """
@@ -63,7 +68,7 @@ def register():
         # Optional: Auto-login after register
         access_token = create_access_token(
             identity=str(new_user.id), # ✅ Cast to string
-            additional_claims={"is_admin": new_user.is_admin}
+            additional_claims={"is_admin": new_user.is_admin, "tv": new_user.token_version}
         )
 
         return ok({
@@ -72,6 +77,9 @@ def register():
             "user": user_schema.dump(new_user)
         }, 201)
 
+    except HashingBusy:
+        db.session.rollback()
+        return busy_error()
     except Exception as e:
         db.session.rollback()
         return error(f"Registration failed: {str(e)}", 500)
@@ -87,12 +95,23 @@ def login():
 
     user = User.query.filter_by(username=username).first()
     
-    # Secure password check using hash
-    if not user or not user.check_password(password):
-        return error("Invalid credentials", 401)
+    # Secure password check using hash (runs on the bounded hashing pool)
+    try:
+        if not user or not user.check_password(password):
+            return error("Invalid credentials", 401)
+    except HashingBusy:
+        return busy_error()
+
+    # Upgrade hashes made with older parameters while we have the plain password
+    if user.password_needs_rehash():
+        try:
+            user.set_password(password)
+            db.session.commit()
+        except HashingBusy:
+            db.session.rollback()  # try again on a later login
 
     # ✅ CRITICAL: Passing Admin Status to Token
-    additional_claims = {"is_admin": user.is_admin}
+    additional_claims = {"is_admin": user.is_admin, "tv": user.token_version}
 
     access_token = create_access_token(
         identity=str(user.id), # ✅ Cast to string for safety
@@ -108,8 +127,7 @@ def login():
 @bp.get("/me")
 @jwt_required()
 def get_current_user():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
+    context = auth_cache.get(db.session, get_jwt_identity())
+    if not context:
         return error("User not found", 404)
-    return ok({"user": user_schema.dump(user)}, 200)
\ No newline at end of file
+    return ok({"user": context_to_dict(context)}, 200)
\ No newline at end of file
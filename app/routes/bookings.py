@@ -1,42 +1,24 @@
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.exc import IntegrityError
 
-from app.models import db, Booking, Car, Coupon, Notification, BookingStatus
+from app.models import db, Booking, Car, Notification, BookingStatus
 from app.schemas import BookingSchema
-from app.services.booking_service import is_car_available
+from app.services.booking_service import MAX_ADVANCE_DAYS, allocate_unit, suggest_alternatives
+from app.services.coupon_service import find_coupon, redeem_coupon
+from app.services.events import booking_changed, notifications_changed
+from app.services.occupancy_index import mark_car_changed
+from app.routes.utils import booking_filters
+from app.utils.dates import get_ist_time, ist_to_utc_iso, parse_to_ist
+from app.utils.metrics import BOOKING_OUTCOMES
+from app.utils.pagination import ListArgumentError, page_meta, paginate
+from app.utils.projection import projection
 from app.utils.responses import ok, error
 
 bp = Blueprint("bookings", __name__)
 booking_schema = BookingSchema()
-bookings_schema = BookingSchema(many=True)
 
-# ✅ HELPER: Convert Input to IST (Indian Standard Time)
-def get_ist_time():
-    """Returns current time in IST"""
-    return datetime.utcnow() + timedelta(hours=5, minutes=30)
-
-def _parse_to_ist(value: str):
-    """
-    Parses an ISO string (likely UTC) and converts it to Naive IST.
-    Example: Input "10:00Z" (UTC) -> Becomes "15:30" (IST)
-    """
-    if not value or not isinstance(value, str): return None
-    try:
-        # 1. Parse the string to a datetime object
-        # If it ends in Z, it's UTC. Replace Z with +00:00 to make it parseable as aware
-        if value.endswith('Z'):
-            dt_utc = datetime.fromisoformat(value.replace('Z', '+00:00'))
-        else:
-            dt_utc = datetime.fromisoformat(value)
-        
-        # 2. Add 5 hours 30 minutes to shift to IST
-        # We do this manually to ensure we get a "Naive" object (no timezone tag)
-        # which plays nicely with your database.
-        return dt_utc.replace(tzinfo=None) + timedelta(hours=5, minutes=30)
-    except ValueError:
-        return None
 
 @bp.post("/")
 @jwt_required()
@@ -54,8 +36,8 @@ def create_booking():
         return error("Invalid Car ID", 400)
 
     # ✅ Convert inputs to IST immediately
-    start_time = _parse_to_ist(start_time_raw)
-    end_time = _parse_to_ist(end_time_raw)
+    start_time = parse_to_ist(start_time_raw)
+    end_time = parse_to_ist(end_time_raw)
 
     if not start_time or not end_time:
         return error("Invalid date format", 400)
@@ -76,12 +58,13 @@ def create_booking():
         return error("Minimum booking duration is 4 hours", 400)
 
     # Rule: Maximum booking advance (e.g., 6 months)
-    if start_time > now_ist + timedelta(days=180):
+    if start_time > now_ist + timedelta(days=MAX_ADVANCE_DAYS):
         return error("Cannot book more than 6 months in advance", 400)
 
     # --- 2. TRANSACTION & CONCURRENCY CONTROL ---
     try:
-        car = Car.query.filter_by(id=car_id).with_for_update().first()
+        # No lock on the car row: concurrency is controlled per physical unit.
+        car = Car.query.filter_by(id=car_id).first()
         
         if not car:
             return error("Car not found", 404)
@@ -89,17 +72,37 @@ def create_booking():
         if car.status != 'AVAILABLE':
             return error("This vehicle is currently unavailable", 400)
 
-        # --- 3. INVENTORY CHECK ---
-        if not is_car_available(db.session, car, start_time, end_time):
-             return error(f"All {car.name}s are fully booked for these dates.", 409)
-
-        # --- 4. COUPON LOGIC ---
+        # --- 3. INVENTORY CHECK (allocates and locks one unit) ---
+        unit = allocate_unit(db.session, car, start_time, end_time)
+        if unit is None:
+            # Release any locks before doing the (read-only) suggestion work.
+            db.session.rollback()
+            windows, alternatives = suggest_alternatives(
+                db.session, car, start_time, end_time,
+                earliest=now_ist - timedelta(minutes=5),
+                latest_start=now_ist + timedelta(days=MAX_ADVANCE_DAYS),
+            )
+            BOOKING_OUTCOMES.inc(outcome="conflict")
+            return error(f"All {car.name}s are fully booked for these dates.", 409, {
+                "next_available": [
+                    {"start_time": ist_to_utc_iso(s), "end_time": ist_to_utc_iso(e)}
+                    for s, e in windows
+                ],
+                "alternatives": [
+                    {"id": alt.id, "brand": alt.brand, "name": alt.name, "available_units": units}
+                    for alt, units in alternatives
+                ],
+            })
+
+        # --- 4. COUPON LOGIC (plain read; redeemed atomically just before commit) ---
         coupon = None
         if coupon_code:
-            coupon = Coupon.query.filter(Coupon.code.ilike(coupon_code)).with_for_update().first()
+            coupon = find_coupon(db.session, coupon_code)
             if not coupon:
+                BOOKING_OUTCOMES.inc(outcome="coupon_rejected")
                 return error("Invalid coupon code", 400)
             if not coupon.is_valid_for_use(start_time):
+                BOOKING_OUTCOMES.inc(outcome="coupon_rejected")
                 return error("Coupon expired or limit reached", 400)
 
         # --- 5. CREATE BOOKING ---
@@ -107,6 +110,7 @@ def create_booking():
         booking = Booking(
             user_id=user_id,
             car_id=car.id,
+            unit_id=unit.id,
             start_time=start_time,
             end_time=end_time,
             status=BookingStatus.PENDING,
@@ -114,10 +118,10 @@ def create_booking():
 
         if coupon:
             booking.coupon = coupon
-            coupon.usage_count = (coupon.usage_count or 0) + 1
 
         db.session.add(booking)
         db.session.flush() 
+        mark_car_changed(db.session, car.id)
 
         # --- 6. NOTIFICATION ---
         db.session.add(Notification(
@@ -125,17 +129,28 @@ def create_booking():
             booking_id=booking.id,
             message=f"Booking #{booking.id} request received."
         ))
+        booking_changed(db.session, booking.id)
+        notifications_changed(db.session, user_id)
+
+        # Last statement before commit, so the coupon row is locked as briefly as possible.
+        if coupon and not redeem_coupon(db.session, coupon.id):
+            db.session.rollback()
+            BOOKING_OUTCOMES.inc(outcome="coupon_rejected")
+            return error("Coupon expired or limit reached", 400)
 
         db.session.commit()
+        BOOKING_OUTCOMES.inc(outcome="created")
         
         booking = Booking.query.get(booking.id)
         return ok({"booking": booking_schema.dump(booking)}, 201)
 
     except IntegrityError:
         db.session.rollback()
+        BOOKING_OUTCOMES.inc(outcome="error")
         return error("Database integrity error", 400)
     except Exception as e:
         db.session.rollback()
+        BOOKING_OUTCOMES.inc(outcome="error")
         print(f"Booking Error: {str(e)}")
         return error("An internal error occurred processing your booking", 500)
 
@@ -147,24 +162,30 @@ def create_booking():
 @bp.get("/")
 @jwt_required()
 def list_bookings():
+    """
+    The caller's bookings, newest first. Paginated (see app/utils/pagination.py).
+    Filters: status (comma-separated), car_id, from/to (overlapping window).
+    Projection (see app/utils/projection.py): fields, include=car,unit,coupon (default car).
+    """
     user_id = get_jwt_identity()
-    bookings = Booking.query.filter_by(user_id=user_id).order_by(Booking.created_at.desc()).all()
-    return ok({"bookings": bookings_schema.dump(bookings)}, 200)
+    try:
+        projected = projection(request.args, BookingSchema, default_include=("car",))
+        query = (
+            Booking.query.options(*projected.loader_options())
+            .filter(Booking.user_id == user_id, *booking_filters(request.args, by_user=False))
+        )
+        page = paginate(query, (Booking.created_at, Booking.id), request.args)
+    except ListArgumentError as e:
+        return error(str(e), 400)
+    return ok({"bookings": projected.dump(page.items), **page_meta(page)}, 200)
 
 @bp.get("/<int:booking_id>")
 @jwt_required()
 def get_booking(booking_id):
     booking = Booking.query.get_or_404(booking_id)
     
-    # Auto-Cancellation Logic (IST Aware)
-    if booking.status == BookingStatus.PENDING:
-        # Use IST to calculate expiry
-        limit_time = booking.created_at + timedelta(minutes=5)
-        
-        if get_ist_time() > limit_time:
-            booking.status = BookingStatus.CANCELLED
-            db.session.commit()
-
+    # Expired PENDING bookings are cancelled by the auto_reject_bookings job
+    # (app/jobs.py, app/services/expiry_service.py), not here.
     status_str = booking.status.value if hasattr(booking.status, 'value') else str(booking.status)
     
     return ok({
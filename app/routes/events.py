@@ -0,0 +1,124 @@
+# RENTAL_CAR/app/routes/events.py
+import time
+
+from flask import Blueprint, current_app, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.models import db, Booking, Notification
+from app.schemas import NotificationSchema
+from app.services import invalidation
+from app.services.events import ALL_USERS, booking_channel, change_bus, user_channel
+from app.utils.responses import ok, error
+from app.utils.serializers import dump_rows, entity_columns
+
+bp = Blueprint("events", __name__)
+notifications_schema = NotificationSchema(many=True)
+
+DEFAULT_WAIT_SECONDS = 25
+MAX_WAIT_SECONDS = 55
+# Suggested delay before a client retries when every waiter slot is taken.
+BUSY_RETRY_SECONDS = 5
+
+
+def _collect(uid, booking_id, known_status, after_id):
+    """What changed compared to what the client already has (empty dict if nothing)."""
+    changes = {}
+
+    if booking_id is not None:
+        row = (
+            Booking.query.with_entities(Booking.id, Booking.status)
+            .filter_by(id=booking_id, user_id=uid)
+            .first()
+        )
+        if row is None:
+            return None
+        if row.status != known_status:
+            changes["booking"] = {"id": row.id, "status": row.status}
+
+    if after_id is not None:
+        notifications = (
+            Notification.query.with_entities(*entity_columns(notifications_schema, Notification))
+            .filter(Notification.user_id == uid, Notification.id > after_id)
+            .order_by(Notification.id)
+            .limit(50)
+            .all()
+        )
+        if notifications:
+            changes["notifications"] = dump_rows(notifications_schema, notifications)
+
+    return changes
+
+
+@bp.get("/wait")
+@jwt_required()
+def wait_for_changes():
+    """
+    Long-poll for booking status transitions and new notifications.
+
+    Query params:
+    - booking_id + booking_status: return when that booking's status differs
+    - after_notification_id: return when a newer notification exists
+    - timeout: seconds to wait (default 25, max 55)
+
+    Responds {"changed": false} on timeout. The database is only queried up
+    front and when a write is published on one of our channels; no
+    connection is held while the request is parked.
+
+    A parked request still occupies a worker thread, so at most
+    EVENTS_MAX_WAITERS requests wait per process (keep it well below the
+    server's thread count). Beyond that the changes are checked once and,
+    if there are none, the answer is {"changed": false, "retry_after": N}
+    straight away.
+    """
+    try:
+        uid = int(get_jwt_identity())
+    except (ValueError, TypeError):
+        return error("Invalid user identity", 422)
+
+    booking_id = request.args.get("booking_id", type=int)
+    known_status = (request.args.get("booking_status") or "").strip().upper() or None
+    after_id = request.args.get("after_notification_id", type=int)
+    timeout = request.args.get("timeout", default=DEFAULT_WAIT_SECONDS, type=int)
+    timeout = min(max(timeout, 1), MAX_WAIT_SECONDS)
+
+    if booking_id is None and after_id is None:
+        return error("Provide booking_id and/or after_notification_id", 400)
+
+    channels = []
+    if booking_id is not None:
+        channels.append(booking_channel(booking_id))
+    if after_id is not None:
+        channels += [user_channel(uid), user_channel(ALL_USERS)]
+
+    # Subscribe before the first check so nothing published in between is missed.
+    waiter = change_bus.subscribe(channels, limit=current_app.config["EVENTS_MAX_WAITERS"])
+    if waiter is None:
+        changes = _collect(uid, booking_id, known_status, after_id)
+        if changes is None:
+            return error("Booking not found", 404)
+        if changes:
+            return ok({"changed": True, **changes}, 200)
+        return ok({"changed": False, "retry_after": BUSY_RETRY_SECONDS}, 200)
+
+    try:
+        deadline = time.monotonic() + timeout
+        check = True
+        while True:
+            if check:
+                changes = _collect(uid, booking_id, known_status, after_id)
+                if changes is None:
+                    return error("Booking not found", 404)
+                if changes:
+                    return ok({"changed": True, **changes}, 200)
+            db.session.close()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return ok({"changed": False}, 200)
+
+            waiter.wait(min(remaining, invalidation.POLL_INTERVAL_SECONDS))
+            # Picks up writes made by other processes (throttled per process).
+            invalidation.poll(db.session)
+            check = waiter.consume()
+    finally:
+        change_bus.unsubscribe(waiter)
@@ -1,8 +1,12 @@
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func
 from app.models import db, Notification, User
 from app.schemas import NotificationSchema
+from app.services.events import notifications_changed
+from app.services.notification_service import broadcast
 from app.utils.responses import ok, error
+from app.utils.serializers import dump_rows, entity_columns
 from app.routes.utils import admin_required
 
 bp = Blueprint("notifications", __name__, url_prefix="/notifications")
@@ -19,13 +23,34 @@ def get_notifications():
     except (ValueError, TypeError):
         return error("Invalid user identity", 422)
 
+    # Plain rows, not ORM instances: the bell polls this, so skip identity-map work.
     notifications = (
-        Notification.query.filter_by(user_id=uid)
+        Notification.query.with_entities(*entity_columns(notifications_schema, Notification))
+        .filter_by(user_id=uid)
         .order_by(Notification.created_at.desc())
         .limit(50)
         .all()
     )
-    return ok({"items": notifications_schema.dump(notifications)}, 200)
+    return ok({"items": dump_rows(notifications_schema, notifications)}, 200)
+
+@bp.get("/unread-count")
+@jwt_required()
+def get_unread_count():
+    """
+    Badge count only; served from the (user_id, is_read) index.
+    """
+    user_id = get_jwt_identity()
+    try:
+        uid = int(user_id)
+    except (ValueError, TypeError):
+        return error("Invalid user identity", 422)
+
+    count = (
+        db.session.query(func.count(Notification.id))
+        .filter(Notification.user_id == uid, Notification.is_read == False)
+        .scalar()
+    )
+    return ok({"count": count}, 200)
 
 # ✅ EXISTING: Create Notification (Single or Broadcast)
 @bp.post("/")
@@ -42,30 +67,25 @@ def create_notification():
         return error("Message is required", 400)
 
     try:
-        notifications_to_create = []
-
         if is_broadcast:
-            users = User.query.all()
-            for user in users:
-                notifications_to_create.append(
-                    Notification(user_id=user.id, message=message, is_read=False)
-                )
-        else:
-            if not target_user_id:
-                return error("user_id is required for single notifications", 400)
-            
-            target_user = User.query.get(target_user_id)
-            if not target_user:
-                return error(f"User ID {target_user_id} not found", 404)
-            
-            notifications_to_create.append(
-                Notification(user_id=target_user.id, message=message, is_read=False)
-            )
-
-        db.session.add_all(notifications_to_create)
+            # Set-based fan-out in bounded chunks (no ORM object per user)
+            sent = broadcast(db.session, message)
+            notifications_changed(db.session)
+            db.session.commit()
+            return ok({"message": f"Sent to {sent} users"}, 201)
+
+        if not target_user_id:
+            return error("user_id is required for single notifications", 400)
+
+        target_user = User.query.get(target_user_id)
+        if not target_user:
+            return error(f"User ID {target_user_id} not found", 404)
+
+        db.session.add(Notification(user_id=target_user.id, message=message, is_read=False))
+        notifications_changed(db.session, target_user.id)
         db.session.commit()
-        
-        return ok({"message": f"Sent to {len(notifications_to_create)} users"}, 201)
+
+        return ok({"message": "Sent to 1 users"}, 201)
 
     except Exception as e:
         db.session.rollback()
@@ -129,4 +149,37 @@ def mark_as_read(notification_id):
     notification.is_read = True
     db.session.commit()
 
-    return ok({"item": notification_schema.dump(notification)}, 200)
\ No newline at end of file
+    return ok({"item": notification_schema.dump(notification)}, 200)
+
+# Bulk Mark as Read: {"ids": [1, 2, 3]} or {"all": true}
+@bp.patch("/read")
+@jwt_required()
+def mark_many_as_read():
+    user_id = get_jwt_identity()
+    try:
+        uid = int(user_id)
+    except (ValueError, TypeError):
+        return error("Invalid user identity", 422)
+
+    payload = request.get_json(silent=True) or {}
+    ids = payload.get("ids")
+    mark_all = payload.get("all") is True
+
+    query = Notification.query.filter(
+        Notification.user_id == uid,
+        Notification.is_read == False,
+    )
+    if not mark_all:
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return error("Provide 'ids' (list of integers) or 'all': true", 400)
+        if not ids:
+            return ok({"updated": 0}, 200)
+        query = query.filter(Notification.id.in_(ids))
+
+    try:
+        updated = query.update({"is_read": True}, synchronize_session=False)
+        db.session.commit()
+        return ok({"updated": updated}, 200)
+    except Exception as e:
+        db.session.rollback()
+        return error(f"Update failed: {str(e)}", 500)
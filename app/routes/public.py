@@ -1,13 +1,17 @@
-from flask import Blueprint
-from datetime import datetime
-from app.models import Coupon, Car
-from app.utils.responses import ok
+from flask import Blueprint, current_app, request
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from app.models import db, Coupon, Car, normalize_coupon_code
+from app.services.booking_service import MAX_ADVANCE_DAYS, availability_calendar, search_available_cars
+from app.services.catalog_cache import CARS, COUPONS, catalog_cache
+from app.services.pricing import coupon_terms, from_cents, quote_grid, rate_card
+from app.utils.dates import get_ist_time, parse_to_ist
+from app.utils.responses import cached_ok, ok, error
 
 # ✅ FIX: Removed url_prefix here because it is already handled in __init__.py
 bp = Blueprint("public", __name__) 
 
-@bp.get("/cars")
-def list_public_cars():
+def _public_cars_body():
     cars = (
         Car.query.with_entities(
             Car.id,
@@ -34,19 +38,188 @@ def list_public_cars():
         for car in cars
     ]
 
+    return current_app.json.dumps({"items": items, "total": len(items)}).encode(), None
+
+@bp.get("/cars")
+def list_public_cars():
+    entry = catalog_cache.get(db.session, CARS, _public_cars_body)
+    return cached_ok(entry, current_app.config["PUBLIC_CACHE_MAX_AGE"])
+
+@bp.get("/cars/availability")
+def search_availability():
+    """
+    Free units per AVAILABLE car for a start/end window (ISO, UTC like booking input).
+    """
+    start_time = parse_to_ist(request.args.get("start_time"))
+    end_time = parse_to_ist(request.args.get("end_time"))
+
+    if not start_time or not end_time:
+        return error("Invalid date format", 400)
+    if start_time >= end_time:
+        return error("End time must be after start time", 400)
+
+    results = search_available_cars(db.session, start_time, end_time)
+
+    items = [
+        {
+            "id": car.id,
+            "brand": car.brand,
+            "name": car.name,
+            "category_id": car.category_id,
+            "price": float(car.daily_rate),
+            "image": car.image,
+            "status": car.status,
+            "quantity": car.quantity,
+            "available_units": free_units,
+        }
+        for car, free_units in results
+    ]
+
+    return ok({
+        "items": items,
+        "total": len(items),
+        "available": sum(1 for item in items if item["available_units"] > 0),
+    }, 200)
+
+CALENDAR_STEPS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+def _calendar_for(cars):
+    """
+    Shared body of the calendar endpoints.
+    Query params: days (1-180, default 30), granularity ("hour" or "day").
+    Slot starts are naive IST, like booking times.
+    """
+    granularity = request.args.get("granularity", "day")
+    if granularity not in CALENDAR_STEPS:
+        return error("granularity must be 'hour' or 'day'", 400)
+    try:
+        days = int(request.args.get("days", 30))
+    except ValueError:
+        return error("days must be a number", 400)
+    if not 1 <= days <= MAX_ADVANCE_DAYS:
+        return error(f"days must be between 1 and {MAX_ADVANCE_DAYS}", 400)
+
+    step = CALENDAR_STEPS[granularity]
+    now_ist = get_ist_time()
+    if granularity == "day":
+        origin = now_ist.replace(hour=0, minute=0, second=0, microsecond=0)
+    else:
+        origin = now_ist.replace(minute=0, second=0, microsecond=0)
+    slot_count = int(timedelta(days=days) / step)
+
+    free = availability_calendar(db.session, cars, origin, slot_count, step)
+
+    return ok({
+        "granularity": granularity,
+        "slots": [(origin + step * i).isoformat() for i in range(slot_count)],
+        "cars": [
+            {"id": car.id, "name": car.name, "quantity": car.quantity, "free": free[car.id]}
+            for car in cars
+        ],
+        "free_total": [sum(units) for units in zip(*free.values())],
+    }, 200)
+
+def _calendar_cars_query():
+    return Car.query.with_entities(
+        Car.id, Car.name, Car.quantity, Car.cleaning_time
+    ).filter(Car.status == "AVAILABLE")
+
+@bp.get("/cars/<int:car_id>/calendar")
+def car_calendar(car_id):
+    cars = _calendar_cars_query().filter(Car.id == car_id).all()
+    if not cars:
+        return error("Car not found", 404)
+    return _calendar_for(cars)
+
+@bp.get("/categories/<int:category_id>/calendar")
+def category_calendar(category_id):
+    cars = _calendar_cars_query().filter(Car.category_id == category_id).order_by(Car.id).all()
+    if not cars:
+        return error("No available cars in this category", 404)
+    return _calendar_for(cars)
+
+MAX_QUOTES = 20000
+
+@bp.post("/quotes")
+def batch_quotes():
+    """
+    Prices every car x window x coupon combination in one call.
+    Body: {"car_ids": [..]} or {"category_id": n},
+          "windows": [{"start_time": iso, "end_time": iso}, ...],
+          optional "coupon_codes": [..] (a null entry means "no coupon";
+          unknown codes are rejected with 400 and listed in invalid_coupon_codes).
+    Prices equal what a booking with the same inputs would store.
+    """
+    payload = request.get_json(silent=True) or {}
+    car_ids = payload.get("car_ids")
+    category_id = payload.get("category_id")
+    raw_windows = payload.get("windows", [])
+    codes = payload.get("coupon_codes")
+    if not isinstance(raw_windows, list):
+        return error("windows must be a list", 400)
+    if codes is None or codes == []:
+        codes = [None]
+    if not isinstance(codes, list) or not all(code is None or isinstance(code, str) for code in codes):
+        return error("coupon_codes must be a list of strings (or null for no coupon)", 400)
+
+    windows = []
+    for window in raw_windows:
+        if not isinstance(window, dict):
+            return error("Each window must be an object", 400)
+        start_time = parse_to_ist(window.get("start_time"))
+        end_time = parse_to_ist(window.get("end_time"))
+        if not start_time or not end_time or start_time >= end_time:
+            return error("Each window needs a valid start_time before end_time", 400)
+        windows.append((start_time, end_time))
+    if not windows:
+        return error("At least one window is required", 400)
+
+    query = Car.query.with_entities(Car.id, Car.twelve_hour_rate, Car.daily_rate)
+    if isinstance(car_ids, list) and all(isinstance(i, int) for i in car_ids):
+        query = query.filter(Car.id.in_(car_ids))
+    elif isinstance(category_id, int):
+        query = query.filter(Car.category_id == category_id, Car.status == "AVAILABLE")
+    else:
+        return error("Provide car_ids (list of integers) or category_id", 400)
+    cards = [rate_card(car) for car in query.order_by(Car.id).all()]
+
+    wanted = {normalize_coupon_code(code) for code in codes if isinstance(code, str)} - {""}
+    found = {}
+    if wanted:
+        for coupon in Coupon.query.filter(Coupon.code.in_(wanted)).all():
+            found[coupon.code] = coupon_terms(coupon)
+    missing = wanted - set(found)
+    unknown = [code for code in codes if isinstance(code, str) and normalize_coupon_code(code) in missing]
+    if unknown:
+        return error("Invalid coupon code", 400, extra={"invalid_coupon_codes": unknown})
+    # A blank code means no coupon, as when booking.
+    coupons = [None if code is None else found.get(normalize_coupon_code(code)) for code in codes]
+
+    if len(cards) * len(windows) * len(coupons) > MAX_QUOTES:
+        return error(f"Too many combinations (max {MAX_QUOTES})", 400)
+
+    items = [
+        {
+            "car_id": card.car_id,
+            "start_time": raw_windows[window_index]["start_time"],
+            "end_time": raw_windows[window_index]["end_time"],
+            "coupon_code": codes[coupon_index],
+            "total_price": str(from_cents(cents)),
+        }
+        for card, window_index, coupon_index, cents in quote_grid(cards, windows, coupons)
+    ]
     return ok({"items": items, "total": len(items)}, 200)
 
-@bp.get("/coupons")
-def list_active_coupons():
+def _active_coupons_body():
     now = datetime.now()
+    usable = (Coupon.active == True, Coupon.usage_count < Coupon.usage_limit)
     
     # Fetch active coupons
     coupons = (
         Coupon.query.filter(
-            Coupon.active == True,
+            *usable,
             Coupon.valid_from <= now,
             Coupon.valid_to >= now,
-            Coupon.usage_count < Coupon.usage_limit
         )
         .order_by(Coupon.discount_percentage.desc())
         .all()
@@ -61,4 +234,15 @@ def list_active_coupons():
         for c in coupons
     ]
 
-    return ok({"items": items}, 200)
\ No newline at end of file
+    # The list changes by itself when a coupon starts or ends; the entry must not outlive that.
+    starts = db.session.query(func.min(Coupon.valid_from)).filter(*usable, Coupon.valid_from > now).scalar()
+    ends = db.session.query(func.min(Coupon.valid_to)).filter(*usable, Coupon.valid_to >= now).scalar()
+    # valid_to is inclusive, so a coupon disappears just after it.
+    boundaries = [b for b in (starts, ends and ends + timedelta(microseconds=1)) if b is not None]
+
+    return current_app.json.dumps({"items": items}).encode(), min(boundaries, default=None)
+
+@bp.get("/coupons")
+def list_active_coupons():
+    entry = catalog_cache.get(db.session, COUPONS, _active_coupons_body)
+    return cached_ok(entry, current_app.config["PUBLIC_CACHE_MAX_AGE"])
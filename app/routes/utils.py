@@ -1,21 +1,62 @@
 # RENTAL_CAR/app/routes/utils.py
 from functools import wraps
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from app.models import User # Make sure to import your User model
+from flask import current_app, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from app.models import db, Booking, BookingStatus
+from app.services.auth_cache import auth_cache
+from app.utils.pagination import parse_choices, parse_int, parse_time
 from app.utils.responses import error
 
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
 def admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        
-        # Query the DB to get the most up-to-date status
-        user = User.query.get(user_id)
-        
-        if not user or not user.is_admin:
+        claims = get_jwt()
+
+        # Optionally trust the signed is_admin claim for read-only requests
+        if (
+            request.method in READ_ONLY_METHODS
+            and current_app.config.get("AUTH_TRUST_CLAIMS_ON_READ")
+            and claims.get("is_admin")
+        ):
+            return fn(*args, **kwargs)
+
+        # Up-to-date status from the per-process auth cache (no DB query on a hit)
+        context = auth_cache.get(db.session, get_jwt_identity())
+
+        if not context or not context.is_admin:
             return error("Forbidden: Admins only", 403)
+        if claims.get("tv", 0) != context.token_version:
+            return error("Token is no longer valid, please log in again", 401)
             
         return fn(*args, **kwargs)
 
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+def booking_filters(args, by_user=True):
+    """
+    Filter criteria for booking lists from query params:
+    status (comma-separated), car_id, user_id (if by_user) and a from/to
+    window (ISO, UTC) that the booking must overlap.
+    """
+    criteria = []
+    statuses = parse_choices(args, "status", BookingStatus.ALL)
+    if statuses:
+        criteria.append(Booking.status.in_(statuses))
+    car_id = parse_int(args, "car_id")
+    if car_id is not None:
+        criteria.append(Booking.car_id == car_id)
+    if by_user:
+        user_id = parse_int(args, "user_id")
+        if user_id is not None:
+            criteria.append(Booking.user_id == user_id)
+    window_start = parse_time(args, "from")
+    if window_start is not None:
+        criteria.append(Booking.end_time > window_start)
+    window_end = parse_time(args, "to")
+    if window_end is not None:
+        criteria.append(Booking.start_time < window_end)
+    return criteria
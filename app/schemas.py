@@ -2,10 +2,17 @@
 from marshmallow import fields
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema, auto_field
 
-from app.models import db, User, Category, Car, Booking, Coupon, Notification
+from app.models import db, User, Category, Car, CarUnit, Booking, Coupon, Notification
 
 
 class BaseSchema(SQLAlchemyAutoSchema):
+    """
+    Schemas never serialise back-references (include_relationships = False);
+    related objects are explicit Nested fields, listed in `includable` when a
+    list endpoint may embed them on request (see app/utils/projection.py).
+    """
+    includable = ()
+
     class Meta:
         sqla_session = db.session
         load_instance = True
@@ -15,6 +22,7 @@ class UserSchema(BaseSchema):
     class Meta(BaseSchema.Meta):
         model = User
         include_relationships = False
+        exclude = ("token_version",)
 
     password = fields.String(load_only=True, required=False)
     password_hash = fields.String(load_only=True)
@@ -23,18 +31,27 @@ class UserSchema(BaseSchema):
 class CategorySchema(BaseSchema):
     class Meta(BaseSchema.Meta):
         model = Category
-        include_relationships = True
+        include_relationships = False
 
 
 class CarSchema(BaseSchema):
+    includable = ("category",)
+
     class Meta(BaseSchema.Meta):
         model = Car
         include_fk = True
-        include_relationships = True
+        include_relationships = False
 
     category = fields.Nested(CategorySchema, dump_only=True)
 
 
+class CarUnitSchema(BaseSchema):
+    class Meta(BaseSchema.Meta):
+        model = CarUnit
+        include_fk = True
+        include_relationships = False
+
+
 class CouponSchema(BaseSchema):
     class Meta(BaseSchema.Meta):
         model = Coupon
@@ -42,12 +59,16 @@ class CouponSchema(BaseSchema):
 
 
 class BookingSchema(BaseSchema):
+    includable = ("car", "unit", "coupon")
+
     class Meta(BaseSchema.Meta):
         model = Booking
         include_fk = True
-        include_relationships = True
+        include_relationships = False
 
-    car = fields.Nested(CarSchema, dump_only=True)
+    # One level deep only: a booking's car comes without its category.
+    car = fields.Nested(CarSchema, exclude=("category",), dump_only=True)
+    unit = fields.Nested(CarUnitSchema, dump_only=True)
     coupon = fields.Nested(CouponSchema, dump_only=True)
 
 
@@ -0,0 +1,92 @@
+# app/services/auth_cache.py
+"""
+Per-process cache of the user facts that authorisation needs.
+
+admin_required and /auth/me read from here instead of loading the User row
+on every request. Entries are bounded (LRU) and expire after a short TTL;
+deleting a user or changing their admin flag also drops the entry in every
+process through the invalidation log.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from app.models import User
+from app.services import invalidation
+from app.utils.db_routing import primary_reads
+
+TOPIC = "auth"
+AUTH_CACHE_SIZE = 10000
+AUTH_CACHE_TTL_SECONDS = 30.0
+
+AuthContext = namedtuple("AuthContext", "user_id username is_admin created_at token_version")
+
+
+class AuthCache:
+    def __init__(self, maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, session, user_id):
+        """Returns the AuthContext for user_id, or None if the user does not exist."""
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+
+        invalidation.poll(session)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+            generation = self._generation
+
+        with primary_reads(session):
+            row = (
+                session.query(User.id, User.username, User.is_admin, User.created_at, User.token_version)
+                .filter(User.id == user_id)
+                .first()
+            )
+        # Missing users are cached too, so a deleted account can't force a query per request.
+        context = AuthContext(*row) if row else None
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[user_id] = (now + self.ttl, context)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return context
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(int(user_id), None)
+
+
+auth_cache = AuthCache()
+invalidation.subscribe(TOPIC, auth_cache.invalidate)
+
+
+def user_changed(session, user_id):
+    """Call in the same transaction as deleting a user or changing is_admin."""
+    invalidation.publish(session, TOPIC, user_id)
+
+
+def context_to_dict(context):
+    """Same shape as UserSchema().dump(user)."""
+    return {
+        "id": context.user_id,
+        "username": context.username,
+        "is_admin": context.is_admin,
+        "created_at": context.created_at.isoformat() if context.created_at else None,
+    }
@@ -1,41 +1,304 @@
 # app/services/booking_service.py
-from sqlalchemy import func, or_, and_
-from app.models import Booking, BookingStatus
+import math
+import time
+from collections import defaultdict
 from datetime import timedelta
+from itertools import accumulate
 
-def is_car_available(session, car, start_time, end_time, buffer_hours=2):
-    """
-    Checks if a car is available by counting overlapping active bookings.
-    Includes a buffer time for cleaning/turnaround.
-    """
-    
-    # 1. Define the interval we want to book
-    # We essentially "pad" the requested time to check for conflicts
-    req_start = start_time
-    req_end = end_time + timedelta(hours=buffer_hours) # Add buffer to the end
-
-    # 2. Query for overlapping bookings
-    # Overlap Logic: (StartA < EndB) and (EndA > StartB)
-    overlapping_bookings = session.query(func.count(Booking.id)).filter(
-        Booking.car_id == car.id,
-        
-        # Check for ACTIVE statuses only
-        Booking.status.in_([
-            BookingStatus.PENDING, 
-            BookingStatus.APPROVED, 
-            BookingStatus.CONFIRMED
-        ]),
-        
-        # The Overlap Condition
-        # We check if existing bookings overlap with our requested window
-        # Note: We add buffer to the existing booking's end time as well logic-wise
-        and_(
-            Booking.start_time < req_end,
-            Booking.end_time + timedelta(hours=buffer_hours) > req_start
-        )
+from sqlalchemy import func
+from app.models import Booking, BookingStatus, Car, CarUnit
+from app.services.occupancy_index import CarIntervals, occupancy_index, is_enabled as occupancy_cache_enabled
+from app.utils.metrics import UNIT_LOCK_WAIT
+
+# Minimum turnaround between two trips of the same car, in hours.
+DEFAULT_BUFFER_HOURS = 2
+
+# Bookings (and therefore calendars) can start at most this far ahead.
+MAX_ADVANCE_DAYS = 180
+
+# How far either side of a rejected window we look for a free slot.
+SUGGESTION_HORIZON = timedelta(days=14)
+SUGGESTION_STEP = timedelta(hours=1)
+
+
+def turnaround_hours(car, buffer_hours=None):
+    """
+    Hours of cleaning/turnaround padding enforced around each booking of a car.
+    Uses the car's own cleaning_time, but never less than the default buffer.
+    """
+    if buffer_hours is not None:
+        return buffer_hours
+    return max(car.cleaning_time or 0, DEFAULT_BUFFER_HOURS)
+
+
+def allocate_unit(session, car, start_time, end_time, buffer_hours=None):
+    """
+    Picks a free physical unit of `car` for the window and locks it, or
+    returns None when every unit is taken.
+
+    Only the chosen unit row is locked (units being booked by another
+    transaction are skipped), so concurrent bookings of the same model
+    proceed in parallel up to its number of units.
+    """
+    buffer = timedelta(hours=turnaround_hours(car, buffer_hours))
+    # (StartA < EndB) and (EndA > StartB), both sides padded by the buffer. The
+    # padding goes on the bound parameters, not the columns, so the predicate
+    # stays index-friendly.
+    overlap = (
+        Booking.status.in_(BookingStatus.BLOCKING),
+        Booking.start_time < end_time + buffer,
+        Booking.end_time > start_time - buffer,
+    )
+
+    # Bookings made before units existed have no unit_id; each one still
+    # occupies some unit of the model.
+    unassigned = session.query(func.count(Booking.id)).filter(
+        Booking.car_id == car.id, Booking.unit_id.is_(None), *overlap
     ).scalar()
+    busy_units = session.query(Booking.unit_id).filter(
+        Booking.car_id == car.id, Booking.unit_id.isnot(None), *overlap
+    )
+    candidates = [
+        unit_id
+        for (unit_id,) in session.query(CarUnit.id)
+        .filter(
+            CarUnit.car_id == car.id,
+            CarUnit.status == CarUnit.ACTIVE,
+            CarUnit.id.notin_(busy_units),
+        )
+        .order_by(CarUnit.id)
+    ]
+    if len(candidates) <= unassigned:
+        return None
+
+    # Time spent in the locking reads, exported as booking_unit_lock_wait_seconds.
+    locked_at = time.perf_counter()
+    try:
+        return _lock_free_unit(session, candidates, overlap)
+    finally:
+        UNIT_LOCK_WAIT.observe(time.perf_counter() - locked_at)
+
+
+def _lock_free_unit(session, candidates, overlap):
+    for unit_id in candidates:
+        unit = (
+            session.query(CarUnit)
+            .filter(CarUnit.id == unit_id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if unit is None:
+            continue  # another transaction is booking this unit right now
+
+        # Re-check under the unit lock with a locking read, so a booking
+        # committed after our snapshot was taken is still seen.
+        clash = (
+            session.query(Booking.id)
+            .filter(Booking.unit_id == unit.id, *overlap)
+            .with_for_update()
+            .first()
+        )
+        if clash is None:
+            return unit
+
+    return None
+
+
+def search_available_cars(session, start_time, end_time):
+    """
+    Returns (car_row, free_units) for every AVAILABLE car for the given window.
+
+    Uses one query for the catalog and one bulk fetch of the overlapping
+    bookings, then counts per car in memory, so the cost does not grow with
+    the number of models in the fleet.
+    """
+    cars = (
+        session.query(
+            Car.id,
+            Car.brand,
+            Car.name,
+            Car.category_id,
+            Car.daily_rate,
+            Car.twelve_hour_rate,
+            Car.image,
+            Car.status,
+            Car.quantity,
+            Car.cleaning_time,
+        )
+        .filter(Car.status == "AVAILABLE")
+        .order_by(Car.created_at.desc())
+        .all()
+    )
+    if not cars:
+        return []
+
+    buffers = {car.id: timedelta(hours=turnaround_hours(car)) for car in cars}
+    widest = max(buffers.values())
+
+    if occupancy_cache_enabled():
+        intervals = occupancy_index.load(session, list(buffers), start_time - widest, end_time + widest)
+        return [
+            (
+                car,
+                max(car.quantity - intervals[car.id].count_overlapping(
+                    start_time - buffers[car.id], end_time + buffers[car.id]
+                ), 0),
+            )
+            for car in cars
+        ]
+
+    # Widen the window by the largest buffer; the exact per-car buffer is
+    # applied below while counting.
+    rows = (
+        session.query(Booking.car_id, Booking.start_time, Booking.end_time)
+        .join(Car, Car.id == Booking.car_id)
+        .filter(
+            Car.status == "AVAILABLE",
+            Booking.status.in_(BookingStatus.BLOCKING),
+            Booking.start_time < end_time + widest,
+            Booking.end_time > start_time - widest,
+        )
+        .all()
+    )
+
+    busy = defaultdict(int)
+    for car_id, booked_start, booked_end in rows:
+        buffer = buffers[car_id]
+        if booked_start < end_time + buffer and booked_end > start_time - buffer:
+            busy[car_id] += 1
+
+    return [(car, max(car.quantity - busy[car.id], 0)) for car in cars]
+
+
+def availability_calendar(session, cars, origin, slot_count, step):
+    """
+    Free units per time slot for each car: {car_id: [free_units, ...]}.
+
+    Slot i covers [origin + i*step, origin + (i+1)*step). A booking makes a unit
+    busy for every slot its buffered interval touches: the overlap rule
+    allocate_unit applies to a single window (start < end + buffer and
+    end > start - buffer).
+
+    One fetch of the bookings overlapping the range (or the occupancy index),
+    then a difference-array sweep per car: O(bookings + slots), independent of
+    the slot size.
+    """
+    if not cars or slot_count <= 0:
+        return {}
+
+    buffers = {car.id: timedelta(hours=turnaround_hours(car)) for car in cars}
+    widest = max(buffers.values())
+    range_end = origin + step * slot_count
+
+    if occupancy_cache_enabled():
+        intervals = occupancy_index.load(session, list(buffers), origin - widest, range_end + widest)
+        booked = {car_id: (entry.starts, entry.ends) for car_id, entry in intervals.items()}
+    else:
+        rows = (
+            session.query(Booking.car_id, Booking.start_time, Booking.end_time)
+            .filter(
+                Booking.car_id.in_(list(buffers)),
+                Booking.status.in_(BookingStatus.BLOCKING),
+                Booking.start_time < range_end + widest,
+                Booking.end_time > origin - widest,
+            )
+            .all()
+        )
+        booked = {car_id: ([], []) for car_id in buffers}
+        for car_id, booked_start, booked_end in rows:
+            booked[car_id][0].append(booked_start)
+            booked[car_id][1].append(booked_end)
+
+    # A booking adds one busy unit from the first slot whose end is after its
+    # padded start up to (excluding) the first slot starting at or after its
+    # padded end. Both bounds are clamped to [0, slot_count], so bookings
+    # outside the range cancel out.
+    step_seconds = step.total_seconds()
+
+    def slot(moment, rounding):
+        return min(max(rounding((moment - origin).total_seconds() / step_seconds), 0), slot_count)
+
+    deltas = {car.id: [0] * (slot_count + 1) for car in cars}
+    for car_id, (starts, ends) in booked.items():
+        buffer = buffers[car_id]
+        for booked_start in starts:
+            deltas[car_id][slot(booked_start - buffer, math.floor)] += 1
+        for booked_end in ends:
+            deltas[car_id][slot(booked_end + buffer, math.ceil)] -= 1
+
+    return {
+        car.id: [max(car.quantity - busy, 0) for busy in accumulate(deltas[car.id][:slot_count])]
+        for car in cars
+    }
+
+
+def suggest_alternatives(session, car, start_time, end_time, earliest, latest_start, limit=3):
+    """
+    For a window that is fully booked, returns (next_windows, alternative_cars):
+    - the `limit` windows of the same duration nearest to start_time (hourly
+      steps, starting between `earliest` and `latest_start`) where `car` has
+      a free unit;
+    - other AVAILABLE cars of the same category that are free for the
+      original window, as (car_row, free_units).
+
+    One query for the category's cars, one bulk fetch of their bookings (or
+    the occupancy index).
+    """
+    peers = (
+        session.query(Car.id, Car.brand, Car.name, Car.quantity, Car.cleaning_time)
+        .filter(
+            Car.category_id == car.category_id,
+            Car.status == "AVAILABLE",
+            Car.id != car.id,
+        )
+        .all()
+    )
+    buffers = {peer.id: timedelta(hours=turnaround_hours(peer)) for peer in peers}
+    buffers[car.id] = timedelta(hours=turnaround_hours(car))
+    widest = max(buffers.values())
+    span_start = start_time - SUGGESTION_HORIZON - widest
+    span_end = end_time + SUGGESTION_HORIZON + widest
+
+    if occupancy_cache_enabled():
+        intervals = occupancy_index.load(session, list(buffers), span_start, span_end)
+    else:
+        rows = (
+            session.query(Booking.car_id, Booking.start_time, Booking.end_time)
+            .filter(
+                Booking.car_id.in_(list(buffers)),
+                Booking.status.in_(BookingStatus.BLOCKING),
+                Booking.start_time < span_end,
+                Booking.end_time > span_start,
+            )
+            .all()
+        )
+        grouped = {car_id: [] for car_id in buffers}
+        for car_id, booked_start, booked_end in rows:
+            grouped[car_id].append((booked_start, booked_end))
+        intervals = {car_id: CarIntervals(items, span_start, span_end) for car_id, items in grouped.items()}
+
+    def free_units(car_id, quantity, window_start, window_end):
+        buffer = buffers[car_id]
+        busy = intervals[car_id].count_overlapping(window_start - buffer, window_end + buffer)
+        return quantity - busy
+
+    # Nearest first: +1h, -1h, +2h, -2h, ...
+    duration = end_time - start_time
+    windows = []
+    steps = int(SUGGESTION_HORIZON / SUGGESTION_STEP)
+    for k in range(1, steps + 1):
+        for candidate in (start_time + SUGGESTION_STEP * k, start_time - SUGGESTION_STEP * k):
+            if not earliest <= candidate <= latest_start:
+                continue
+            if free_units(car.id, car.quantity, candidate, candidate + duration) > 0:
+                windows.append((candidate, candidate + duration))
+        if len(windows) >= limit:
+            break
+
+    alternatives = []
+    for peer in peers:
+        units = free_units(peer.id, peer.quantity, start_time, end_time)
+        if units > 0:
+            alternatives.append((peer, units))
 
-    # 3. The Verdict
-    # If the number of overlapping bookings is LESS than the total fleet quantity,
-    # then we still have a car available.
-    return overlapping_bookings < car.quantity
\ No newline at end of file
+    return windows[:limit], alternatives
@@ -0,0 +1,71 @@
+# app/services/catalog_cache.py
+"""
+Response cache for the public catalog endpoints (/public/cars, /public/coupons).
+
+Each section has a version number that admin mutations bump through the
+invalidation log (catalog_changed), so every worker process drops its copy.
+An entry is built once per version and holds the serialised body and its
+ETag; entries may also carry an expiry time for content that changes with
+the clock (coupon validity windows).
+"""
+import hashlib
+import threading
+from collections import defaultdict, namedtuple
+from datetime import datetime
+
+from app.services import invalidation
+from app.utils.db_routing import primary_reads
+
+TOPIC = "catalog"
+CARS = "cars"
+COUPONS = "coupons"
+
+CatalogEntry = namedtuple("CatalogEntry", "body etag expires_at")
+
+
+class CatalogCache:
+    def __init__(self):
+        self._entries = {}
+        self._versions = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get(self, session, section, build):
+        """
+        Returns the CatalogEntry for section, calling build() on a miss.
+        build() returns (body_bytes, expires_at), expires_at a naive local
+        datetime or None.
+        """
+        invalidation.poll(session)
+
+        with self._lock:
+            version = self._versions[section]
+            entry = self._entries.get(section)
+        if entry is not None and entry[0] == version and (
+            entry[1].expires_at is None or datetime.now() < entry[1].expires_at
+        ):
+            return entry[1]
+
+        with primary_reads(session):
+            body, expires_at = build()
+        # The ETag depends only on the content, so it is the same in every worker process.
+        fresh = CatalogEntry(body, hashlib.sha1(body).hexdigest(), expires_at)
+        with self._lock:
+            if version == self._versions[section]:
+                self._entries[section] = (version, fresh)
+        return fresh
+
+    def invalidate(self, section=None):
+        with self._lock:
+            sections = list(self._versions) + list(self._entries) if section is None else [section]
+            for name in sections:
+                self._versions[name] += 1
+                self._entries.pop(name, None)
+
+
+catalog_cache = CatalogCache()
+invalidation.subscribe(TOPIC, catalog_cache.invalidate)
+
+
+def catalog_changed(session, section):
+    """Call in the same transaction as a change to what a public catalog section shows."""
+    invalidation.publish(session, TOPIC, section)
@@ -0,0 +1,48 @@
+# app/services/coupon_service.py
+"""
+Coupon lookup and redemption.
+
+Codes are stored normalised (see normalize_coupon_code), so lookups are a
+plain equality on the unique index. Redemption is one conditional UPDATE;
+its rowcount decides whether the coupon was still available, so concurrent
+bookings never over-redeem and nothing is locked before the booking is
+ready to commit.
+"""
+from sqlalchemy import update
+
+from app.models import Coupon, normalize_coupon_code
+from app.services.catalog_cache import COUPONS, catalog_changed
+
+
+def find_coupon(session, code):
+    code = normalize_coupon_code(code)
+    if not code:
+        return None
+    return session.query(Coupon).filter(Coupon.code == code).first()
+
+
+def redeem_coupon(session, coupon_id):
+    """
+    Takes one use of the coupon. Returns False if it is inactive or its
+    usage limit was reached in the meantime (the caller should roll back).
+    Call it as late as possible in the transaction: the row stays locked
+    until commit. Taking the last use removes the coupon from /public/coupons.
+    """
+    result = session.execute(
+        update(Coupon)
+        .where(
+            Coupon.id == coupon_id,
+            Coupon.active.is_(True),
+            Coupon.usage_count < Coupon.usage_limit,
+        )
+        .values(usage_count=Coupon.usage_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+
+    # We hold the row lock, so this sees the count our UPDATE produced.
+    remaining = session.query(Coupon.usage_limit - Coupon.usage_count).filter(Coupon.id == coupon_id).scalar()
+    if remaining <= 0:
+        catalog_changed(session, COUPONS)
+    return True
@@ -0,0 +1,109 @@
+# app/services/events.py
+"""
+In-process change bus for clients waiting on booking status or new notifications.
+
+Write paths call booking_changed() / notifications_changed() in their
+transaction. The change is recorded in the invalidation log, so waiters in
+every worker process are woken: immediately after the commit in the writing
+process, and on the next invalidation poll everywhere else.
+
+A waiter is just a threading.Event registered on the channels it cares
+about; publishing wakes only the waiters of that channel. Each parked
+waiter holds a request thread, so subscribe() can be capped per process.
+"""
+import threading
+from collections import defaultdict
+
+from app.services import invalidation
+
+BOOKING_TOPIC = "booking"
+NOTIFICATIONS_TOPIC = "notifications"
+ALL_USERS = "*"
+
+
+class Waiter:
+    __slots__ = ("channels", "event")
+
+    def __init__(self, channels):
+        self.channels = tuple(channels)
+        self.event = threading.Event()
+
+    def wait(self, timeout):
+        self.event.wait(timeout)
+
+    def consume(self):
+        """True (once) if something was published on one of our channels."""
+        if not self.event.is_set():
+            return False
+        self.event.clear()
+        return True
+
+
+class ChangeBus:
+    def __init__(self):
+        self._waiters = defaultdict(set)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels, limit=None):
+        """Registers a waiter, or returns None if `limit` waiters are already parked."""
+        waiter = Waiter(channels)
+        with self._lock:
+            if limit is not None and self._count >= limit:
+                return None
+            self._count += 1
+            for channel in waiter.channels:
+                self._waiters[channel].add(waiter)
+        return waiter
+
+    def unsubscribe(self, waiter):
+        with self._lock:
+            self._count -= 1
+            for channel in waiter.channels:
+                waiters = self._waiters.get(channel)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[channel]
+
+    def publish(self, channel):
+        with self._lock:
+            waiters = list(self._waiters.get(channel, ()))
+        for waiter in waiters:
+            waiter.event.set()
+
+    def waiter_count(self):
+        with self._lock:
+            return self._count
+
+
+change_bus = ChangeBus()
+
+
+def booking_channel(booking_id):
+    return f"booking:{booking_id}"
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def _relay_booking(key):
+    change_bus.publish(booking_channel(key))
+
+
+def _relay_notifications(key):
+    change_bus.publish(user_channel(ALL_USERS if key is None else key))
+
+
+invalidation.subscribe(BOOKING_TOPIC, _relay_booking)
+invalidation.subscribe(NOTIFICATIONS_TOPIC, _relay_notifications)
+
+
+def booking_changed(session, booking_id):
+    invalidation.publish(session, BOOKING_TOPIC, booking_id)
+
+
+def notifications_changed(session, user_id=None):
+    """user_id=None means every user (broadcast)."""
+    invalidation.publish(session, NOTIFICATIONS_TOPIC, user_id)
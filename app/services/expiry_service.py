@@ -0,0 +1,101 @@
+# app/services/expiry_service.py
+"""
+Expiry of PENDING bookings that nobody confirmed in time.
+
+Everything is set-based: each batch locks up to EXPIRY_BATCH_SIZE expired
+rows, flips them with one UPDATE and inserts their notifications with one
+multi-row INSERT. The caller schedules the next run from next_run_at()
+instead of polling on a fixed tick.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, update
+
+from app.models import Booking, BookingStatus, Notification
+from app.services.events import booking_changed, notifications_changed
+from app.services.occupancy_index import mark_car_changed
+
+PENDING_TTL = timedelta(minutes=5)
+EXPIRY_BATCH_SIZE = 500
+EXPIRY_MAX_BATCHES = 20
+# Never reschedule closer than this, e.g. while expired rows are locked elsewhere.
+MIN_RESCHEDULE = timedelta(seconds=5)
+
+
+def expire_pending_bookings(session, now=None, batch_size=EXPIRY_BATCH_SIZE, max_batches=EXPIRY_MAX_BATCHES):
+    """
+    Cancels PENDING bookings created more than PENDING_TTL ago.
+    Returns (expired_count, has_more); has_more is True when the run stopped
+    at max_batches with expired rows still left.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - PENDING_TTL
+    expired = 0
+
+    for _ in range(max_batches):
+        # Lock the batch so a concurrent admin approval either wins or waits;
+        # rows locked elsewhere are left for the next run.
+        rows = (
+            session.query(Booking.id, Booking.user_id, Booking.car_id)
+            .filter(
+                Booking.status == BookingStatus.PENDING,
+                Booking.created_at <= cutoff,
+            )
+            .order_by(Booking.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not rows:
+            session.rollback()
+            return expired, False
+
+        session.execute(
+            update(Booking)
+            .where(Booking.id.in_([row.id for row in rows]))
+            .values(status=BookingStatus.CANCELLED)
+            .execution_options(synchronize_session=False)
+        )
+        session.execute(insert(Notification), [
+            {
+                "user_id": row.user_id,
+                "booking_id": row.id,
+                "message": f"Booking #{row.id} expired after {int(PENDING_TTL.total_seconds() // 60)} minutes.",
+                "is_read": False,
+                "created_at": now,
+            }
+            for row in rows
+        ])
+        for car_id in {row.car_id for row in rows}:
+            mark_car_changed(session, car_id)
+        for row in rows:
+            booking_changed(session, row.id)
+        for user_id in {row.user_id for row in rows}:
+            notifications_changed(session, user_id)
+        session.commit()
+
+        expired += len(rows)
+        if len(rows) < batch_size:
+            return expired, False
+
+    return expired, True
+
+
+def next_run_at(session, now=None):
+    """
+    When the expiry job should run next (naive UTC).
+
+    The oldest PENDING booking's deadline, capped at now + PENDING_TTL: any
+    booking created after this call expires no earlier than that, so the job
+    never needs to be nudged by the write paths.
+    """
+    now = now or datetime.utcnow()
+    oldest = (
+        session.query(func.min(Booking.created_at))
+        .filter(Booking.status == BookingStatus.PENDING)
+        .scalar()
+    )
+    session.rollback()
+    if oldest is None:
+        return now + PENDING_TTL
+    return min(max(oldest + PENDING_TTL, now + MIN_RESCHEDULE), now + PENDING_TTL)
@@ -0,0 +1,89 @@
+# app/services/fleet_service.py
+from sqlalchemy import func
+
+from app.models import Booking, BookingStatus, CarUnit
+from app.utils.dates import get_ist_time
+
+
+class FleetError(ValueError):
+    """Raised when the requested fleet change would strand live bookings."""
+
+
+def active_unit_count(session, car_id):
+    return session.query(func.count(CarUnit.id)).filter(
+        CarUnit.car_id == car_id,
+        CarUnit.status == CarUnit.ACTIVE,
+    ).scalar()
+
+
+def normalize_plate(plate):
+    """Blank plates are stored as NULL: car_units.number_plate is unique."""
+    return (plate or "").strip().upper() or None
+
+
+def busy_unit_ids(session, unit_ids):
+    """The units among unit_ids that still have an upcoming blocking booking."""
+    return {
+        unit_id
+        for (unit_id,) in session.query(Booking.unit_id).filter(
+            Booking.unit_id.in_(unit_ids),
+            Booking.status.in_(BookingStatus.BLOCKING),
+            Booking.end_time > get_ist_time(),
+        )
+    }
+
+
+def retire_unit(session, unit):
+    """
+    Retires one unit, refusing if it has upcoming bookings or is the car's
+    last ACTIVE unit (Car.quantity, which mirrors the ACTIVE units, can't
+    drop below 1).
+    """
+    if unit.status == CarUnit.RETIRED:
+        return
+    if busy_unit_ids(session, [unit.id]):
+        raise FleetError("Cannot retire a unit that has upcoming bookings")
+    if active_unit_count(session, unit.car_id) <= 1:
+        raise FleetError("Cannot retire the last active unit; mark the car unavailable instead")
+    unit.status = CarUnit.RETIRED
+
+
+def sync_car_units(session, car):
+    """
+    Makes the ACTIVE units of `car` match car.quantity.
+
+    Missing units are added (the first unit of a new car inherits
+    car.number_plate, unless it is blank or another unit already has it).
+    Surplus units are retired newest first, skipping any unit that still
+    has an upcoming blocking booking.
+    """
+    active = (
+        session.query(CarUnit)
+        .filter(CarUnit.car_id == car.id, CarUnit.status == CarUnit.ACTIVE)
+        .order_by(CarUnit.id)
+        .all()
+    )
+    target = car.quantity or 1
+
+    if len(active) < target:
+        has_units = session.query(CarUnit.id).filter(CarUnit.car_id == car.id).first() is not None
+        first_plate = normalize_plate(car.number_plate)
+        if first_plate and session.query(CarUnit.id).filter(CarUnit.number_plate == first_plate).first():
+            first_plate = None
+        for i in range(target - len(active)):
+            plate = first_plate if (not has_units and i == 0) else None
+            session.add(CarUnit(car_id=car.id, number_plate=plate, status=CarUnit.ACTIVE))
+        return
+
+    surplus = len(active) - target
+    if surplus <= 0:
+        return
+
+    busy = busy_unit_ids(session, [unit.id for unit in active])
+    retirable = [unit for unit in reversed(active) if unit.id not in busy]
+    if len(retirable) < surplus:
+        raise FleetError(
+            f"Cannot reduce quantity to {target}: only {len(retirable)} units are free of upcoming bookings"
+        )
+    for unit in retirable[:surplus]:
+        unit.status = CarUnit.RETIRED
@@ -0,0 +1,123 @@
+# app/services/invalidation.py
+"""
+Cross-process cache invalidation.
+
+Writers call publish() inside their transaction: the event row commits (or
+rolls back) together with the change it describes, and the local subscribers
+are called right after that commit. Every worker calls poll() from its read
+paths; at most once per POLL_INTERVAL_SECONDS it reads the new rows from the
+log and hands them to the local subscribers.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from app.models import InvalidationEvent
+
+POLL_INTERVAL_SECONDS = 1.0
+
+# Ids are assigned at INSERT but become visible at COMMIT, so a lower id can
+# appear after a higher one. Each poll re-reads this many ids below the
+# high-water mark and skips the ones it has already dispatched.
+ID_LOOKBACK = 200
+
+# session.info key holding events to dispatch locally after commit.
+_PENDING = "pending_invalidations"
+
+_handlers = defaultdict(list)
+_lock = threading.Lock()
+_seen_ids = set()
+_seen_order = deque()
+_state = {"last_id": None, "last_poll": 0.0}
+
+
+def subscribe(topic, handler):
+    """Registers handler(key) for a topic. key is a string, or None for "everything"."""
+    _handlers[topic].append(handler)
+
+
+def _dispatch(topic, key):
+    for handler in _handlers.get(topic, ()):
+        handler(key)
+
+
+def publish(session, topic, key=None):
+    """Records an invalidation in the current transaction; applied locally once it commits."""
+    key = None if key is None else str(key)
+    row = InvalidationEvent(topic=topic, key=key)
+    session.add(row)
+    session.info.setdefault(_PENDING, []).append((row, topic, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed(session):
+    for row, topic, key in session.info.pop(_PENDING, ()):
+        # Remembered, so the next poll doesn't dispatch our own event again.
+        # The row is expired by now; its identity key is read without a query.
+        identity = inspect(row).identity
+        if identity is not None:
+            with _lock:
+                _remember(identity[0])
+        _dispatch(topic, key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING, None)
+
+
+def _remember(event_id):
+    _seen_ids.add(event_id)
+    _seen_order.append(event_id)
+    while len(_seen_order) > ID_LOOKBACK * 2:
+        _seen_ids.discard(_seen_order.popleft())
+
+
+def poll(session, force=False):
+    """Applies invalidations published by other processes since the last poll."""
+    now = time.monotonic()
+    if not force and now - _state["last_poll"] < POLL_INTERVAL_SECONDS:
+        return
+    if not _lock.acquire(blocking=False):
+        return  # another thread is already polling
+
+    try:
+        _state["last_poll"] = now
+
+        if _state["last_id"] is None:
+            # Nothing is cached before the first poll, so older events are irrelevant.
+            _state["last_id"] = session.query(
+                func.coalesce(func.max(InvalidationEvent.id), 0)
+            ).scalar()
+            return
+
+        events = (
+            session.query(InvalidationEvent.id, InvalidationEvent.topic, InvalidationEvent.key)
+            .filter(InvalidationEvent.id > _state["last_id"] - ID_LOOKBACK)
+            .order_by(InvalidationEvent.id)
+            .all()
+        )
+        for event_id, topic, key in events:
+            if event_id in _seen_ids:
+                continue
+            _remember(event_id)
+            _dispatch(topic, key)
+            _state["last_id"] = max(_state["last_id"], event_id)
+    finally:
+        _lock.release()
+
+
+def prune(session, max_age=timedelta(hours=1)):
+    """Deletes log rows every worker has long since polled. Returns the row count."""
+    cutoff = datetime.utcnow() - max_age
+    deleted = (
+        session.query(InvalidationEvent)
+        .filter(InvalidationEvent.created_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+    session.commit()
+    return deleted
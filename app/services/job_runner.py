@@ -0,0 +1,104 @@
+# app/services/job_runner.py
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from app.models import JobLease, JobStat
+from app.utils.metrics import JOB_DURATION
+
+LEASE_TTL = timedelta(seconds=30)
+
+
+class LeaderLease:
+    """
+    A named lease row in job_leases. acquire() both takes a free/expired lease
+    and renews one we already hold, with a single conditional UPDATE.
+    """
+
+    def __init__(self, name, ttl=LEASE_TTL):
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._held_until = None
+
+    def acquire(self, session):
+        now = datetime.utcnow()
+        expires_at = now + self.ttl
+        updated = (
+            session.query(JobLease)
+            .filter(
+                JobLease.name == self.name,
+                or_(JobLease.holder == self.holder, JobLease.expires_at < now),
+            )
+            .update({"holder": self.holder, "expires_at": expires_at}, synchronize_session=False)
+        )
+        if not updated:
+            if session.get(JobLease, self.name) is not None:
+                session.rollback()
+                self._held_until = None
+                return False
+            session.add(JobLease(name=self.name, holder=self.holder, expires_at=expires_at))
+
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another process created the row first.
+            session.rollback()
+            self._held_until = None
+            return False
+
+        self._held_until = expires_at
+        return True
+
+    def is_held(self):
+        return self._held_until is not None and datetime.utcnow() < self._held_until
+
+    def release(self, session):
+        if self._held_until is None:
+            return
+        session.query(JobLease).filter(
+            JobLease.name == self.name, JobLease.holder == self.holder
+        ).delete(synchronize_session=False)
+        session.commit()
+        self._held_until = None
+
+
+def run_recorded(session, name, fn):
+    """
+    Runs fn() and records duration, rows affected and last success in job_stats.
+    fn returns the number of rows it touched (or a tuple whose first item is).
+    Exceptions are recorded and re-raised.
+    """
+    started_at = datetime.utcnow()
+    started = time.perf_counter()
+    result, failure = None, None
+    try:
+        result = fn()
+    except Exception as e:
+        session.rollback()
+        failure = e
+
+    stat = session.get(JobStat, name) or JobStat(name=name, run_count=0, failure_count=0)
+    stat.last_started_at = started_at
+    elapsed = time.perf_counter() - started
+    JOB_DURATION.observe(elapsed, job=name, result="ok" if failure is None else "failed")
+    stat.last_duration_ms = int(elapsed * 1000)
+    stat.run_count += 1
+    if failure is None:
+        stat.last_success_at = datetime.utcnow()
+        stat.last_rows = result[0] if isinstance(result, tuple) else result
+        stat.last_error = None
+    else:
+        stat.failure_count += 1
+        stat.last_error = str(failure)[:255]
+    session.add(stat)
+    session.commit()
+
+    if failure is not None:
+        raise failure
+    return result
@@ -0,0 +1,51 @@
+# app/services/notification_service.py
+from datetime import datetime
+
+from sqlalchemy import insert, literal, select
+
+from app.models import Notification, User
+
+BROADCAST_CHUNK_SIZE = 5000
+
+
+def broadcast(session, message, chunk_size=BROADCAST_CHUNK_SIZE):
+    """
+    Sends `message` to every user with server-side INSERT ... SELECT statements,
+    one per chunk of user ids, each committed on its own so no transaction
+    grows with the user count and no Python object is built per recipient.
+    Returns the number of notifications created.
+    """
+    now = datetime.utcnow()
+    sent = 0
+    last_id = 0
+
+    while True:
+        # Upper bound of this chunk: the chunk_size-th user id after last_id.
+        upper = session.execute(
+            select(User.id)
+            .where(User.id > last_id)
+            .order_by(User.id)
+            .offset(chunk_size - 1)
+            .limit(1)
+        ).scalar()
+
+        recipients = select(
+            User.id,
+            literal(message),
+            literal(False),
+            literal(now),
+        ).where(User.id > last_id)
+        if upper is not None:
+            recipients = recipients.where(User.id <= upper)
+
+        result = session.execute(
+            insert(Notification).from_select(
+                ["user_id", "message", "is_read", "created_at"], recipients
+            )
+        )
+        session.commit()
+        sent += result.rowcount
+
+        if upper is None:
+            return sent
+        last_id = upper
@@ -0,0 +1,131 @@
+# app/services/occupancy_index.py
+"""
+Optional per-process cache of blocking bookings, keyed by car_id.
+
+Each car keeps its booking starts and ends in two sorted lists, so "how many
+bookings overlap [start, end)" is two binary searches instead of a range
+query. Entries are built lazily and dropped whenever a booking of that car is
+created, changes status or is deleted, in this process or (via the
+invalidation log) in any other one.
+
+Only bookings near the present are held: an entry covers the span around
+the time it was loaded (SPAN_BEHIND / SPAN_AHEAD), and a query reaching
+outside that span reloads the car with a wider one.
+
+This is a read-path cache only: create_booking still verifies availability
+against the database while holding its lock.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from flask import current_app
+
+from app.models import Booking, BookingStatus
+from app.services import invalidation
+from app.utils.dates import get_ist_time
+from app.utils.db_routing import primary_reads
+
+TOPIC = "occupancy"
+
+# Span loaded per car, around the current (IST) time. Behind: a turnaround
+# buffer, plus the midnight origin of a day calendar. Ahead: the latest
+# bookable start (booking_service.MAX_ADVANCE_DAYS) plus a long trip.
+SPAN_BEHIND = timedelta(days=2)
+SPAN_AHEAD = timedelta(days=200)
+
+
+class CarIntervals:
+    """Blocking bookings of one car that overlap [span_start, span_end)."""
+
+    __slots__ = ("starts", "ends", "span_start", "span_end")
+
+    def __init__(self, intervals, span_start, span_end):
+        self.starts = sorted(start for start, _ in intervals)
+        self.ends = sorted(end for _, end in intervals)
+        self.span_start = span_start
+        self.span_end = span_end
+
+    def covers(self, start, end):
+        return self.span_start <= start and end <= self.span_end
+
+    def count_overlapping(self, start, end):
+        """Bookings with booked_start < end and booked_end > start."""
+        # Every booking ending at or before `start` also starts before `end`,
+        # so it is counted in the first term and subtracted by the second.
+        return bisect_left(self.starts, end) - bisect_right(self.ends, start)
+
+
+class OccupancyIndex:
+    def __init__(self):
+        self._cars = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def invalidate(self, car_id=None):
+        with self._lock:
+            self._generation += 1
+            if car_id is None:
+                self._cars.clear()
+            else:
+                self._cars.pop(int(car_id), None)
+
+    def load(self, session, car_ids, start, end):
+        """
+        Returns {car_id: CarIntervals} covering [start, end), fetching all
+        missing (or too narrow) cars in one query.
+        """
+        invalidation.poll(session)
+
+        with self._lock:
+            found = {
+                cid: self._cars[cid]
+                for cid in car_ids
+                if cid in self._cars and self._cars[cid].covers(start, end)
+            }
+            generation = self._generation
+        missing = [cid for cid in car_ids if cid not in found]
+        if not missing:
+            return found
+
+        now = get_ist_time()
+        span_start, span_end = min(start, now - SPAN_BEHIND), max(end, now + SPAN_AHEAD)
+        with primary_reads(session):
+            rows = (
+                session.query(Booking.car_id, Booking.start_time, Booking.end_time)
+                .filter(
+                    Booking.car_id.in_(missing),
+                    Booking.status.in_(BookingStatus.BLOCKING),
+                    Booking.start_time < span_end,
+                    Booking.end_time > span_start,
+                )
+                .all()
+            )
+        grouped = {cid: [] for cid in missing}
+        for car_id, booked_start, booked_end in rows:
+            grouped[car_id].append((booked_start, booked_end))
+        built = {cid: CarIntervals(intervals, span_start, span_end) for cid, intervals in grouped.items()}
+
+        with self._lock:
+            # Skip caching if something was invalidated while we were reading.
+            if generation == self._generation:
+                self._cars.update(built)
+
+        found.update(built)
+        return found
+
+    def count_overlapping(self, session, car_id, start, end):
+        return self.load(session, [car_id], start, end)[car_id].count_overlapping(start, end)
+
+
+occupancy_index = OccupancyIndex()
+invalidation.subscribe(TOPIC, occupancy_index.invalidate)
+
+
+def is_enabled():
+    return current_app.config.get("OCCUPANCY_CACHE_ENABLED", False)
+
+
+def mark_car_changed(session, car_id):
+    """Call in the same transaction as any write that changes a car's blocking bookings."""
+    invalidation.publish(session, TOPIC, car_id)
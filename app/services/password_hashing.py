@@ -0,0 +1,130 @@
+# app/services/password_hashing.py
+"""
+Password hashing on a small dedicated thread pool.
+
+The KDF is deliberately CPU-heavy, so a login/register burst must not be
+able to occupy every request thread. At most PASSWORD_HASH_WORKERS hashes run
+at once and at most PASSWORD_HASH_QUEUE more may wait; anything beyond that
+fails fast with HashingBusy, which the auth routes turn into a 503.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_HASH_METHOD = "scrypt:32768:8:1"
+
+
+class HashingBusy(Exception):
+    """The hashing pool is saturated; the client should retry later."""
+
+
+class HashingPool:
+    def __init__(self, workers, max_queue, wait_timeout):
+        self.workers = workers
+        self.capacity = workers + max_queue
+        self.wait_timeout = wait_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {
+            "completed": 0,
+            "rejected": 0,
+            "hash_seconds_total": 0.0,
+            "hash_seconds_max": 0.0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._stats["rejected"] += 1
+                return False
+            self._pending += 1
+            return True
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def _record(self, waited, ran):
+        with self._lock:
+            stats = self._stats
+            stats["completed"] += 1
+            stats["hash_seconds_total"] += ran
+            stats["hash_seconds_max"] = max(stats["hash_seconds_max"], ran)
+            stats["wait_seconds_total"] += waited
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+
+    def run(self, fn, *args):
+        if not self._admit():
+            raise HashingBusy()
+
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._record(started - submitted, time.perf_counter() - started)
+
+        try:
+            future = self._executor.submit(task)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=self.wait_timeout)
+        except FutureTimeout:
+            raise HashingBusy()
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self._pending,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = current_app.config
+                _pool = HashingPool(
+                    workers=config.get("PASSWORD_HASH_WORKERS") or min(4, os.cpu_count() or 1),
+                    max_queue=config.get("PASSWORD_HASH_QUEUE", 32),
+                    wait_timeout=config.get("PASSWORD_HASH_TIMEOUT", 5.0),
+                )
+    return _pool
+
+
+def hash_method():
+    return current_app.config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD)
+
+
+def hash_password(password):
+    return get_pool().run(generate_password_hash, password, hash_method())
+
+
+def verify_password(pwhash, password):
+    return get_pool().run(check_password_hash, pwhash, password)
+
+
+def needs_rehash(pwhash):
+    """True if the stored hash was made with other parameters than the configured ones."""
+    return pwhash.split("$", 1)[0] != hash_method()
@@ -0,0 +1,103 @@
+# app/services/pricing.py
+"""
+Booking pricing rules on a precomputed rate card.
+
+12-hour rate up to 12h, daily rate up to 24h, then daily rate per started
+day; a coupon applies if it is usable and valid at the start time. Works in
+integer cents on plain tuples, so batch quotes and calculate_total_price in
+app/models.py (which delegates here) produce identical 2dp prices.
+"""
+import math
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+
+RateCard = namedtuple("RateCard", "car_id twelve_hour_cents daily_cents")
+CouponTerms = namedtuple("CouponTerms", "code discount_hundredths valid_from valid_to usable")
+
+CENT = Decimal("0.01")
+
+# Stored on each booking with the rates it was priced at; bump when the rules change.
+# 2: a booking's own (redeemed) coupon applies even once its usage limit is reached.
+PRICING_VERSION = 2
+
+
+def to_cents(value):
+    return int((Decimal(value) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    return (Decimal(cents) / 100).quantize(CENT)
+
+
+def rate_card(car):
+    """car: Car or any row with id, twelve_hour_rate, daily_rate."""
+    return RateCard(car.id, to_cents(car.twelve_hour_rate), to_cents(car.daily_rate))
+
+
+def coupon_terms(coupon, redeemed=False):
+    """
+    coupon: Coupon or any row with the Coupon columns.
+    redeemed: the use being priced has already been counted (booking pricing),
+    so only `active` decides whether the coupon is usable.
+    """
+    return CouponTerms(
+        code=coupon.code,
+        discount_hundredths=to_cents(coupon.discount_percentage),
+        valid_from=coupon.valid_from,
+        valid_to=coupon.valid_to,
+        usable=bool(coupon.active) and (redeemed or coupon.usage_count < coupon.usage_limit),
+    )
+
+
+def duration_bucket(start_time, end_time):
+    """
+    (use_twelve_hour_rate, days) for a window: float hours, ceil of
+    started days, non-positive durations count as one hour.
+    """
+    total_hours = (end_time - start_time).total_seconds() / 3600
+    if total_hours <= 0:
+        total_hours = 1
+    if total_hours <= 12:
+        return True, 1
+    if total_hours <= 24:
+        return False, 1
+    return False, math.ceil(total_hours / 24)
+
+
+def coupon_applies(terms, start_time):
+    return terms is not None and terms.usable and terms.valid_from <= start_time <= terms.valid_to
+
+
+def apply_coupon(base_cents, terms, start_time):
+    if not coupon_applies(terms, start_time):
+        return base_cents
+    # base * (1 - pct/100) in units of 1/10000 cent, rounded half up to a cent.
+    scaled = base_cents * (10000 - terms.discount_hundredths)
+    if scaled <= 0:
+        return 0
+    return (scaled + 5000) // 10000
+
+
+def quote_cents(card, start_time, end_time, terms=None):
+    twelve, days = duration_bucket(start_time, end_time)
+    base = card.twelve_hour_cents if twelve else card.daily_cents * days
+    return apply_coupon(base, terms, start_time)
+
+
+def quote_grid(cards, windows, coupons=(None,)):
+    """
+    Prices every (card, window, coupon) combination.
+    windows: iterable of (start_time, end_time); coupons: CouponTerms or None.
+    Yields (card, window_index, coupon_index, cents). The duration bucket is
+    computed once per window, and coupon validity once per window and coupon.
+    """
+    for window_index, (start_time, end_time) in enumerate(windows):
+        twelve, days = duration_bucket(start_time, end_time)
+        valid = [terms if coupon_applies(terms, start_time) else None for terms in coupons]
+        for card in cards:
+            base = card.twelve_hour_cents if twelve else card.daily_cents * days
+            for coupon_index, terms in enumerate(valid):
+                if terms is None:
+                    yield card, window_index, coupon_index, base
+                else:
+                    yield card, window_index, coupon_index, apply_coupon(base, terms, start_time)
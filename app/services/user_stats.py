@@ -0,0 +1,44 @@
+# app/services/user_stats.py
+"""
+Per-user booking statistics as correlated subqueries, so a user listing is
+one SQL statement however many users it returns.
+
+Counting and the last booking date are answered from the (user_id,
+created_at) booking index; lifetime spend reads that user's bookings.
+"""
+from sqlalchemy import func, select
+
+from app.models import Booking, BookingStatus, User
+
+# Bookings that count as money spent.
+BILLABLE_STATUSES = (BookingStatus.APPROVED, BookingStatus.CONFIRMED, BookingStatus.COMPLETED)
+
+
+def user_stats_columns():
+    """{name: labelled scalar subquery} correlated to User, for query(User, *columns)."""
+    total_bookings = (
+        select(func.count(Booking.id))
+        .where(Booking.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+        .label("total_bookings")
+    )
+    last_booking_at = (
+        select(func.max(Booking.created_at))
+        .where(Booking.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+        .label("last_booking_at")
+    )
+    lifetime_spend = (
+        select(func.coalesce(func.sum(Booking.total_price), 0))
+        .where(Booking.user_id == User.id, Booking.status.in_(BILLABLE_STATUSES))
+        .correlate(User)
+        .scalar_subquery()
+        .label("lifetime_spend")
+    )
+    return {
+        "total_bookings": total_bookings,
+        "last_booking_at": last_booking_at,
+        "lifetime_spend": lifetime_spend,
+    }
@@ -0,0 +1,34 @@
+# RENTAL_CAR/app/utils/dates.py
+from datetime import datetime, timedelta
+
+IST_OFFSET = timedelta(hours=5, minutes=30)
+
+
+def get_ist_time():
+    """Returns current time in IST"""
+    return datetime.utcnow() + IST_OFFSET
+
+
+def parse_to_ist(value: str):
+    """
+    Parses an ISO string (likely UTC) and converts it to Naive IST.
+    Example: Input "10:00Z" (UTC) -> Becomes "15:30" (IST)
+    """
+    if not value or not isinstance(value, str): return None
+    try:
+        # If it ends in Z, it's UTC. Replace Z with +00:00 to make it parseable as aware
+        if value.endswith('Z'):
+            dt_utc = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        else:
+            dt_utc = datetime.fromisoformat(value)
+
+        # Shift to IST manually so we get a "Naive" object (no timezone tag),
+        # which is how booking times are stored in the database.
+        return dt_utc.replace(tzinfo=None) + IST_OFFSET
+    except ValueError:
+        return None
+
+
+def ist_to_utc_iso(value: datetime):
+    """Inverse of parse_to_ist: naive IST -> ISO string in UTC ("...Z")."""
+    return (value - IST_OFFSET).isoformat() + "Z"
@@ -0,0 +1,200 @@
+# RENTAL_CAR/app/utils/db_routing.py
+"""
+Read-replica routing for db.session.
+
+When a "replica" bind is configured (SQLALCHEMY_BINDS, see create_app),
+plain SELECTs issued while handling a GET/HEAD request go to the replica.
+Everything else stays on the primary:
+
+- writes, locking reads (with_for_update) and any read in a session that
+  has pending or flushed changes
+- requests other than GET/HEAD, CLI commands and background jobs
+- the bookkeeping tables in PRIMARY_TABLES
+- reads inside primary_reads(session): the per-process caches (catalog,
+  occupancy, auth) load through it, since a lagging replica would
+  otherwise be cached until the next invalidation
+- every read by a user for REPLICA_STICKY_SECONDS after that user's last
+  write, so they always see their own changes. Two markers cover this:
+  responses to requests that committed a write carry X-Last-Write (unix
+  time), which the client echoes on later requests, whatever worker
+  serves them; and a per-user marker published through the invalidation
+  log, which every worker polls (throttled) before routing a request's
+  first read, for clients that don't echo the header.
+
+Without a replica bind the router is a no-op.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA = "replica"
+STICKY_TOPIC = "read-primary"
+LAST_WRITE_HEADER = "X-Last-Write"
+PRIMARY_TABLES = {"invalidation_events", "job_leases", "job_stats", "rate_limit_counters"}
+
+# session.info keys
+_WROTE = "wrote"
+_PRIMARY_READS = "primary_reads"
+_STICKY_PUBLISHED = "read_primary_published"
+
+
+class RecentWriters:
+    """user id -> monotonic time until which their reads stay on the primary."""
+
+    def __init__(self):
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id, seconds):
+        now = time.monotonic()
+        with self._lock:
+            self._until[str(user_id)] = now + seconds
+            if len(self._until) > 10000:
+                self._until = {key: until for key, until in self._until.items() if until > now}
+
+    def is_recent(self, user_id):
+        until = self._until.get(str(user_id))
+        return until is not None and until > time.monotonic()
+
+
+recent_writers = RecentWriters()
+
+
+def _request_identity():
+    """JWT identity of the current request, or None (no token / not verified yet)."""
+    try:
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+@contextmanager
+def primary_reads(session):
+    """Reads inside the block go to the primary."""
+    session.info[_PRIMARY_READS] = session.info.get(_PRIMARY_READS, 0) + 1
+    try:
+        yield
+    finally:
+        session.info[_PRIMARY_READS] -= 1
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(mapper, clause):
+            return self._db.engines[REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, mapper, clause):
+        if not has_request_context() or request.method not in ("GET", "HEAD"):
+            return False
+        if REPLICA not in self._db.engines:
+            return False
+        if clause is None or not getattr(clause, "is_select", False) or clause._for_update_arg is not None:
+            return False
+        if mapper is not None and getattr(mapper, "local_table", None) is not None \
+                and mapper.local_table.name in PRIMARY_TABLES:
+            return False
+        if self.info.get(_WROTE) or self.info.get(_PRIMARY_READS) or self.new or self.dirty or self.deleted:
+            return False
+
+        sticky = g.get("read_primary")
+        if sticky is None:
+            g.read_primary = True  # reads made while deciding (the poll) use the primary
+            sticky = g.read_primary = self._recent_writer()
+        return not sticky
+
+    def _recent_writer(self):
+        """Whether this request's reads must see the caller's own recent write."""
+        sticky_seconds = current_app.config["REPLICA_STICKY_SECONDS"]
+        try:
+            last_write = float(request.headers.get(LAST_WRITE_HEADER, ""))
+        except ValueError:
+            last_write = None
+        if last_write is not None and time.time() - last_write < sticky_seconds:
+            return True
+
+        identity = _request_identity()
+        if identity is None:
+            return False
+        from app.services import invalidation
+
+        # Pick up markers published by other workers. The poll itself reads the
+        # primary (invalidation_events is in PRIMARY_TABLES).
+        invalidation.poll(self)
+        return recent_writers.is_recent(identity)
+
+
+def replica_enabled():
+    return REPLICA in current_app.config.get("SQLALCHEMY_BINDS", {})
+
+
+def _note_write(session):
+    """Keeps the rest of this request, and this user's next reads, on the primary."""
+    session.info[_WROTE] = True
+    if session.info.get(_STICKY_PUBLISHED) or not has_request_context() or not replica_enabled():
+        return
+    identity = _request_identity()
+    if identity is not None:
+        from app.services import invalidation
+
+        # Published with the write itself, so it only takes effect if that commits.
+        session.info[_STICKY_PUBLISHED] = True
+        invalidation.publish(session, STICKY_TOPIC, identity)
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _before_flush(session, _flush_context, _instances):
+    if session.new or session.dirty or session.deleted:
+        _note_write(session)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _bulk_write(orm_execute_state):
+    # query.update()/delete() and session.execute(insert/update/delete) skip the flush.
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _note_write(orm_execute_state.session)
+
+
+@event.listens_for(RoutingSession, "after_soft_rollback")
+def _forget_publish(session, _previous_transaction):
+    session.info.pop(_STICKY_PUBLISHED, None)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _reset_publish(session):
+    session.info.pop(_STICKY_PUBLISHED, None)
+    if session.info.get(_WROTE) and has_request_context() and replica_enabled():
+        g.last_write = time.time()
+
+
+def _last_write_header(response):
+    last_write = g.get("last_write")
+    if last_write is not None:
+        response.headers[LAST_WRITE_HEADER] = f"{last_write:.3f}"
+    return response
+
+
+_subscribed = False
+
+
+def init_app(app):
+    """Subscribes to the read-your-writes markers published by every process."""
+    global _subscribed
+    app.config.setdefault("REPLICA_STICKY_SECONDS", 5.0)
+    app.after_request(_last_write_header)
+    if _subscribed:
+        return
+    from app.services import invalidation
+
+    def mark(user_id):
+        if user_id is not None:
+            recent_writers.mark(user_id, current_app.config["REPLICA_STICKY_SECONDS"])
+
+    invalidation.subscribe(STICKY_TOPIC, mark)
+    _subscribed = True
+
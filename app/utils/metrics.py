@@ -0,0 +1,332 @@
+# RENTAL_CAR/app/utils/metrics.py
+"""
+In-process metrics in the Prometheus text format, served at GET /metrics.
+
+Counters and histograms are sharded per thread: each request thread only
+ever writes its own dict, so recording takes no lock and never contends.
+A scrape sums the shards. Gauges that describe shared state (DB pool,
+hashing pool, job stats) are read by callbacks at scrape time instead.
+
+Each worker process has its own registry, so scrape every process (or
+aggregate per pod). Background jobs usually run in a separate process
+(app/jobs.py); their last run from job_stats is exported here as well.
+
+If METRICS_TOKEN is set, scrapes must send "Authorization: Bearer <token>".
+"""
+import bisect
+import hmac
+import itertools
+import threading
+import time
+import weakref
+from datetime import timezone
+
+from flask import Response, current_app, g, request
+
+from app.models import db, JobStat
+from app.services.password_hashing import get_pool as get_hashing_pool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LOCK_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+JOB_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60)
+
+
+class _ShardHolder:
+    """Thread-local owner of a shard; collected when its thread exits."""
+
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self):
+        self.shard = {}
+
+
+class _ThreadShards:
+    """
+    One dict per thread; only the owning thread writes to it. When a thread
+    exits, its shard is folded into a retired total (merge(total, value)
+    returns the new total), so thread-per-request servers don't leave one
+    shard behind per request.
+    """
+
+    def __init__(self, merge):
+        self._merge = merge
+        self._local = threading.local()
+        self._shards = {}
+        self._retired = {}
+        self._lock = threading.Lock()
+        self._next_token = itertools.count()
+
+    def mine(self):
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = self._local.holder = _ShardHolder()
+            token = next(self._next_token)
+            with self._lock:
+                self._shards[token] = holder.shard
+            weakref.finalize(holder, self._retire, token)
+        return holder.shard
+
+    def _retire(self, token):
+        with self._lock:
+            shard = self._shards.pop(token, None)
+            for key, value in (shard or {}).items():
+                total = self._retired.get(key)
+                self._retired[key] = value if total is None else self._merge(total, value)
+
+    def items(self):
+        with self._lock:
+            shards = list(self._shards.values())
+            # Copied, so the retired totals never alias what the caller sums into.
+            items = [(key, self._merge(None, value)) for key, value in self._retired.items()]
+        yield from items
+        for shard in shards:
+            while True:
+                try:
+                    items = list(shard.items())
+                    break
+                except RuntimeError:
+                    continue  # the owner added a key while we copied; retry
+            yield from items
+
+
+def _add(total, value):
+    return value if total is None else total + value
+
+
+def _add_entries(total, value):
+    if total is None:
+        return list(value)
+    return [a + b for a, b in zip(total, value)]
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._shards = _ThreadShards(_add)
+
+    def inc(self, value=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        shard = self._shards.mine()
+        shard[key] = shard.get(key, 0) + value
+
+    def samples(self):
+        totals = {}
+        for key, value in self._shards.items():
+            totals[key] = totals.get(key, 0) + value
+        return [(self.name, _labels(self.labelnames, key), value) for key, value in sorted(totals.items())]
+
+
+class Gauge(Counter):
+    """Up/down gauge whose value is the sum of every thread's inc()/dec()."""
+
+    kind = "gauge"
+
+    def dec(self, value=1, **labels):
+        self.inc(-value, **labels)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._shards = _ThreadShards(_add_entries)
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        shard = self._shards.mine()
+        entry = shard.get(key)
+        if entry is None:
+            # Per-bucket (not cumulative) counts, then +Inf, then the sum.
+            entry = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect.bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def samples(self):
+        totals = {}
+        for key, entry in self._shards.items():
+            total = totals.setdefault(key, [0] * len(entry))
+            for index, value in enumerate(entry):
+                total[index] += value
+
+        lines = []
+        for key, entry in sorted(totals.items()):
+            names = self.labelnames + ("le",)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), entry[:-1]):
+                cumulative += count
+                lines.append((f"{self.name}_bucket", _labels(names, key + (_number(bound),)), cumulative))
+            lines.append((f"{self.name}_sum", _labels(self.labelnames, key), entry[-1]))
+            lines.append((f"{self.name}_count", _labels(self.labelnames, key), cumulative))
+        return lines
+
+
+class Timer:
+    """with Timer(histogram, **labels): observes the block's duration."""
+
+    def __init__(self, histogram, **labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by endpoint, method and status.",
+    ("endpoint", "method", "status"),
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled.")
+UNIT_LOCK_WAIT = Histogram(
+    "booking_unit_lock_wait_seconds", "Time spent acquiring car unit row locks (with_for_update) per booking.",
+    buckets=LOCK_WAIT_BUCKETS,
+)
+BOOKING_OUTCOMES = Counter(
+    "booking_requests_total", "Booking requests by outcome (created, conflict, coupon_rejected, error).",
+    ("outcome",),
+)
+JOB_DURATION = Histogram(
+    "job_duration_seconds", "Background job run time by job and result, in the process running the jobs.",
+    ("job", "result"), buckets=JOB_BUCKETS,
+)
+
+
+POOL_GAUGES = (
+    ("db_pool_size", "Connections the pool keeps open", lambda pool: pool.size()),
+    ("db_pool_checked_out", "Connections currently in use", lambda pool: pool.checkedout()),
+    ("db_pool_overflow", "Connections open beyond the pool size", lambda pool: max(0, pool.overflow())),
+)
+
+
+def _pool_samples():
+    for bind, engine in db.engines.items():
+        labels = _labels(("bind",), (bind or "default",))
+        for name, help, read in POOL_GAUGES:
+            try:
+                value = read(engine.pool)
+            except AttributeError:
+                continue  # pool class without this statistic (e.g. StaticPool)
+            yield "gauge", name, help, labels, value
+
+
+def _hashing_samples():
+    stats = get_hashing_pool().stats()
+    yield "gauge", "password_hash_in_flight", "Password hashes running or queued", "", stats["in_flight"]
+    yield "gauge", "password_hash_capacity", "Password hashing workers plus queue slots", "", stats["capacity"]
+    yield "counter", "password_hash_completed_total", "Password hashes completed", "", stats["completed"]
+    yield "counter", "password_hash_rejected_total", "Password hashes rejected (pool full)", "", stats["rejected"]
+    yield "counter", "password_hash_seconds_total", "Time spent hashing", "", stats["hash_seconds_total"]
+    yield "counter", "password_hash_wait_seconds_total", "Time hashes spent queued", "", stats["wait_seconds_total"]
+
+
+def _job_stat_samples():
+    stats = db.session.query(
+        JobStat.name, JobStat.last_duration_ms, JobStat.last_success_at, JobStat.run_count, JobStat.failure_count
+    ).all()
+    for stat in stats:
+        labels = _labels(("job",), (stat.name,))
+        if stat.last_duration_ms is not None:
+            yield "gauge", "job_last_duration_seconds", "Duration of the job's last run (job_stats)", labels, \
+                stat.last_duration_ms / 1000
+        if stat.last_success_at is not None:
+            yield "gauge", "job_last_success_timestamp_seconds", "Last successful run, unix time (job_stats)", \
+                labels, stat.last_success_at.replace(tzinfo=timezone.utc).timestamp()
+        yield "counter", "job_runs_total", "Job runs recorded in job_stats", labels, stat.run_count
+        yield "counter", "job_failures_total", "Job failures recorded in job_stats", labels, stat.failure_count
+
+
+class Metrics:
+    def __init__(self):
+        self.collectors = [REQUEST_LATENCY, IN_FLIGHT, UNIT_LOCK_WAIT, BOOKING_OUTCOMES, JOB_DURATION]
+        self.callbacks = [_pool_samples, _hashing_samples, _job_stat_samples]
+
+    def init_app(self, app):
+        """Register before other before_request hooks so rejected requests are timed too."""
+        app.config.setdefault("METRICS_ENABLED", True)
+        app.config.setdefault("METRICS_TOKEN", None)
+        if not app.config["METRICS_ENABLED"]:
+            return
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._end_request)
+        app.add_url_rule("/metrics", "metrics", self.view, methods=["GET"])
+
+    def _start_request(self):
+        g.metrics_started = time.perf_counter()
+        IN_FLIGHT.inc()
+
+    def _finish_request(self, response):
+        started = g.get("metrics_started")
+        if started is not None and request.endpoint != "metrics":
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - started,
+                endpoint=request.endpoint or "unmatched",
+                method=request.method,
+                status=response.status_code,
+            )
+        return response
+
+    def _end_request(self, _exc=None):
+        if g.pop("metrics_started", None) is not None:
+            IN_FLIGHT.dec()
+
+    def render(self):
+        lines = []
+        for collector in self.collectors:
+            lines.append(f"# HELP {collector.name} {collector.help}")
+            lines.append(f"# TYPE {collector.name} {collector.kind}")
+            lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in collector.samples())
+
+        # Callback samples are grouped by name: a family's lines must be contiguous.
+        families = {}
+        for callback in self.callbacks:
+            try:
+                samples = list(callback())
+            except Exception as e:
+                current_app.logger.warning(f"metrics: {callback.__name__} failed: {e}")
+                continue
+            for kind, name, help, labels, value in samples:
+                family = families.setdefault(name, (kind, help, []))
+                family[2].append(f"{name}{labels} {_number(value)}")
+        for name, (kind, help, samples) in families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def view(self):
+        token = current_app.config["METRICS_TOKEN"]
+        if token:
+            supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                return Response("unauthorized\n", 401, mimetype="text/plain")
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+
+metrics = Metrics()
@@ -0,0 +1,173 @@
+# RENTAL_CAR/app/utils/pagination.py
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Lists are ordered by (sort column, id) or by id alone, newest first unless
+the endpoint says otherwise. The cursor is the sort key of the last row of
+the previous page, so every page reads at most `limit + 1` rows past an
+indexed position, however deep the client pages and however large the
+table grows.
+
+Query params: limit (1-MAX_PAGE_SIZE, default DEFAULT_PAGE_SIZE), cursor
+(the next_cursor of the previous page) and include_total=true for an extra
+COUNT of all rows matching the filters.
+"""
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import and_, or_
+
+from app.utils.dates import parse_to_ist
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+Page = namedtuple("Page", "items next_cursor total")
+
+
+class ListArgumentError(ValueError):
+    """Bad pagination or filter query parameter; the message is safe to show."""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        return Decimal(value["dec"])
+    return value
+
+
+def _encode_cursor(values):
+    raw = json.dumps([_encode_value(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor, columns):
+    """One value per column; the last one is always the (integer) id."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        *sort_values, row_id = values
+        return [*(_decode_value(v) for v in sort_values), int(row_id)]
+    except (ValueError, TypeError, KeyError, ArithmeticError):
+        raise ListArgumentError("Invalid cursor")
+
+
+def _after(columns, values, descending):
+    """
+    Rows strictly after `values` in (columns...) order. NULLs sort first
+    ascending and last descending (MySQL/SQLite), so a NULL sort value is
+    handled on its own.
+    """
+    if len(columns) == 1:
+        return columns[0] < values[0] if descending else columns[0] > values[0]
+    column, row_id = columns
+    value, id_value = values
+    if descending:
+        if value is None:
+            return and_(column.is_(None), row_id < id_value)
+        return or_(column < value, and_(column == value, row_id < id_value), column.is_(None))
+    if value is None:
+        return or_(and_(column.is_(None), row_id > id_value), column.isnot(None))
+    return or_(column > value, and_(column == value, row_id > id_value))
+
+
+def paginate(query, columns, args, descending=True, key=None):
+    """
+    query: filtered query. columns: (sort column, id) or (id,); the sort
+    column may be any labelled expression. args: request.args.
+    key(row) returns the row's values for `columns`; by default they are
+    read as attributes named like the columns. Returns a Page.
+    """
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ListArgumentError("limit must be a number")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ListArgumentError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    total = None
+    if parse_bool(args, "include_total"):
+        total = query.order_by(None).count()
+
+    cursor = args.get("cursor")
+    if cursor:
+        query = query.filter(_after(columns, _decode_cursor(cursor, columns), descending))
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        values = key(last) if key else [getattr(last, column.key) for column in columns]
+        next_cursor = _encode_cursor(values)
+    return Page(rows, next_cursor, total)
+
+
+def page_meta(page):
+    """Extra response keys for a Page: next_cursor, plus total when requested."""
+    meta = {"next_cursor": page.next_cursor}
+    if page.total is not None:
+        meta["total"] = page.total
+    return meta
+
+
+# --- Filter parsing shared by the list endpoints ---
+
+def parse_bool(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    lowered = value.lower()
+    if lowered in ("1", "true", "yes"):
+        return True
+    if lowered in ("0", "false", "no"):
+        return False
+    raise ListArgumentError(f"{name} must be true or false")
+
+
+def parse_int(args, name):
+    value = args.get(name)
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ListArgumentError(f"{name} must be a number")
+
+
+def parse_choices(args, name, allowed=None):
+    """Comma-separated, case-insensitive list of values (from `allowed`, if given)."""
+    value = args.get(name)
+    if not value:
+        return None
+    chosen = [v.strip().upper() for v in value.split(",") if v.strip()]
+    invalid = [v for v in chosen if allowed is not None and v not in allowed]
+    if invalid:
+        raise ListArgumentError(f"Invalid {name}: {', '.join(invalid)}")
+    return chosen
+
+
+def parse_time(args, name):
+    """ISO timestamp (UTC, like booking input) as naive IST."""
+    value = args.get(name)
+    if not value:
+        return None
+    parsed = parse_to_ist(value)
+    if parsed is None:
+        raise ListArgumentError(f"{name} must be an ISO date/time")
+    return parsed
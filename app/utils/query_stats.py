@@ -0,0 +1,178 @@
+# RENTAL_CAR/app/utils/query_stats.py
+"""
+Per-request SQL instrumentation.
+
+Engine events record every statement executed while a request (or a
+capture() block) is active: query count, total DB time, the slowest
+statements, and statement shapes repeated within the request. A shape
+is the SQL text with whitespace and IN-lists collapsed, so N lazy loads
+of the same relationship count as one shape seen N times; SELECT shapes
+seen at least SQL_N_PLUS_ONE_THRESHOLD times are reported as N+1 suspects.
+
+With SQL_STATS_HEADERS (default: app.debug) responses carry X-DB-Queries,
+X-DB-Time-Ms and X-DB-N-Plus-One. One log line per request goes to the
+app logger: INFO with SQL_STATS_LOG (default: app.debug), WARNING
+whenever there are N+1 suspects.
+
+Query budgets in tests:
+
+    with query_stats.capture() as stats:
+        client.get("/bookings/")
+    assert stats.count == 2
+"""
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    return _IN_LIST.sub("(?)", _SPACES.sub(" ", statement).strip())
+
+
+class QueryRecorder:
+    """Statements seen during one request or capture() block."""
+
+    def __init__(self, keep_slowest=3):
+        self.keep_slowest = keep_slowest
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+        self.slowest = []  # [(seconds, shape)], slowest first
+
+    def record(self, statement, seconds):
+        shape = statement_shape(statement)
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[shape] += 1
+        if len(self.slowest) < self.keep_slowest or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, shape))
+            self.slowest.sort(key=lambda entry: entry[0], reverse=True)
+            del self.slowest[self.keep_slowest:]
+
+    def suspects(self, threshold):
+        """[(shape, times)] for SELECT shapes repeated at least `threshold` times."""
+        return [
+            (shape, times) for shape, times in self.shapes.most_common()
+            if times >= threshold and shape[:6].upper() == "SELECT"
+        ]
+
+
+class QueryStats:
+    def __init__(self):
+        self._local = threading.local()
+        self._listening = False
+
+    def init_app(self, app):
+        app.config.setdefault("SQL_STATS_ENABLED", True)
+        app.config.setdefault("SQL_STATS_HEADERS", app.debug)
+        app.config.setdefault("SQL_STATS_LOG", app.debug)
+        app.config.setdefault("SQL_STATS_SLOWEST", 3)
+        app.config.setdefault("SQL_N_PLUS_ONE_THRESHOLD", 3)
+
+        if not self._listening:
+            # On the Engine class, so every engine and bind is covered.
+            event.listen(Engine, "before_cursor_execute", self._before_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_execute)
+            event.listen(Engine, "handle_error", self._failed_execute)
+            self._listening = True
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._end_request)
+
+    # --- recorders ---
+
+    def _recorders(self):
+        stack = getattr(self._local, "recorders", None)
+        if stack is None:
+            stack = self._local.recorders = []
+        return stack
+
+    @contextmanager
+    def capture(self, keep_slowest=3):
+        """Records statements run by this thread inside the block, requests included."""
+        recorder = QueryRecorder(keep_slowest)
+        stack = self._recorders()
+        stack.append(recorder)
+        try:
+            yield recorder
+        finally:
+            stack.remove(recorder)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._recorders():
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stack = self._recorders()
+        started = conn.info.get("query_started")
+        if not stack or not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        for recorder in stack:
+            recorder.record(statement, elapsed)
+
+    def _failed_execute(self, context):
+        # after_cursor_execute doesn't fire for a failed statement; drop its start time.
+        conn = context.connection
+        started = conn.info.get("query_started") if conn is not None else None
+        if started:
+            started.pop()
+
+    # --- request hooks ---
+
+    def _start_request(self):
+        if not current_app.config["SQL_STATS_ENABLED"]:
+            return
+        recorder = QueryRecorder(current_app.config["SQL_STATS_SLOWEST"])
+        self._recorders().append(recorder)
+        self._local.request_recorder = recorder
+
+    def _finish_request(self, response):
+        recorder = getattr(self._local, "request_recorder", None)
+        if recorder is None:
+            return response
+        config = current_app.config
+        suspects = recorder.suspects(config["SQL_N_PLUS_ONE_THRESHOLD"])
+
+        if config["SQL_STATS_HEADERS"]:
+            response.headers["X-DB-Queries"] = str(recorder.count)
+            response.headers["X-DB-Time-Ms"] = f"{recorder.seconds * 1000:.1f}"
+            response.headers["X-DB-N-Plus-One"] = str(len(suspects))
+
+        if suspects or config["SQL_STATS_LOG"]:
+            line = (
+                f"sql {request.method} {request.path} -> {response.status_code}: "
+                f"{recorder.count} queries, {recorder.seconds * 1000:.1f} ms"
+            )
+            if recorder.slowest:
+                line += "; slowest: " + " | ".join(
+                    f"{seconds * 1000:.1f} ms {shape[:200]}" for seconds, shape in recorder.slowest
+                )
+            if suspects:
+                line += "; N+1 suspects: " + " | ".join(f"{times}x {shape[:200]}" for shape, times in suspects)
+                current_app.logger.warning(line)
+            else:
+                current_app.logger.info(line)
+        return response
+
+    def _end_request(self, _exc=None):
+        recorder = getattr(self._local, "request_recorder", None)
+        if recorder is None:
+            return
+        self._local.request_recorder = None
+        stack = self._recorders()
+        if recorder in stack:
+            stack.remove(recorder)
+
+
+query_stats = QueryStats()
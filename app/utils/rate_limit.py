@@ -0,0 +1,195 @@
+# RENTAL_CAR/app/utils/rate_limit.py
+"""
+Sliding-window rate limiting for all blueprints.
+
+Limits come from app.config["RATE_LIMITS"], keyed by endpoint
+("auth.login") or by blueprint ("bookings"); the endpoint entry wins.
+Values look like "10/minute". Each client is identified by its JWT identity
+when a valid token is present, otherwise by IP address.
+
+The sliding window is approximated from two fixed windows (current and
+previous), so each client/rule needs one small counter entry, not a log of
+timestamps. Counters live in memory by default; the "database" backend
+shares them between worker processes.
+"""
+import math
+import threading
+import time
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import and_, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.models import db, RateLimitCounter
+from app.utils.responses import error
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+DEFAULT_RATE_LIMITS = {
+    "auth.login": "10/minute",
+    "auth.register": "5/minute",
+    "bookings.create_booking": "20/minute",
+    "auth": "60/minute",
+    "bookings": "300/minute",
+    "admin": "600/minute",
+    "notifications": "300/minute",
+    "events": "120/minute",
+    "public": "600/minute",
+}
+
+
+def parse_limit(value):
+    """ "10/minute" -> (10, 60) """
+    amount, _, period = value.partition("/")
+    return int(amount), PERIODS[period.strip().rstrip("s")]
+
+
+class MemoryBackend:
+    """Per-process counters: {period: {key: [window_index, current_count, previous_count]}}."""
+
+    PRUNE_EVERY = 10000
+
+    def __init__(self):
+        self._counters = {period: {} for period in PERIODS.values()}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def hit(self, key, period, window_index):
+        with self._lock:
+            counters = self._counters[period]
+            entry = counters.get(key)
+            if entry is None or entry[0] < window_index - 1:
+                entry = counters[key] = [window_index, 0, 0]
+            elif entry[0] == window_index - 1:
+                entry[0], entry[1], entry[2] = window_index, 0, entry[1]
+            entry[1] += 1
+            current, previous = entry[1], entry[2]
+
+            self._hits += 1
+            if self._hits >= self.PRUNE_EVERY:
+                self._hits = 0
+                self._prune(time.time())
+        return current, previous
+
+    def _prune(self, now):
+        # Entries two or more windows old no longer affect any decision.
+        for period, counters in self._counters.items():
+            window_index = int(now // period)
+            stale = [key for key, entry in counters.items() if entry[0] < window_index - 1]
+            for key in stale:
+                del counters[key]
+
+
+class DatabaseBackend:
+    """Counters in rate_limit_counters, shared by every process using the database."""
+
+    def hit(self, key, period, window_index):
+        # Keys are prefixed with the period so prune() can tell windows of different lengths apart.
+        key = f"{period}:{key}"
+        table = RateLimitCounter.__table__
+        this_window = and_(table.c.key == key, table.c.window_index == window_index)
+
+        with db.engine.begin() as conn:
+            updated = conn.execute(
+                update(table).where(this_window).values(count=table.c.count + 1)
+            ).rowcount
+        if not updated:
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(insert(table).values(key=key, window_index=window_index, count=1))
+            except IntegrityError:
+                # Another process inserted the row first.
+                with db.engine.begin() as conn:
+                    conn.execute(update(table).where(this_window).values(count=table.c.count + 1))
+
+        with db.engine.connect() as conn:
+            counts = dict(conn.execute(
+                select(table.c.window_index, table.c.count).where(
+                    table.c.key == key,
+                    table.c.window_index.in_([window_index, window_index - 1]),
+                )
+            ).all())
+        return counts.get(window_index, 0), counts.get(window_index - 1, 0)
+
+    def prune(self, now=None):
+        """Deletes counters two or more windows old. Returns the row count."""
+        now = now or time.time()
+        table = RateLimitCounter.__table__
+        deleted = 0
+        with db.engine.begin() as conn:
+            for period in PERIODS.values():
+                deleted += conn.execute(
+                    table.delete().where(
+                        table.c.key.like(f"{period}:%"),
+                        table.c.window_index < int(now // period) - 1,
+                    )
+                ).rowcount
+        return deleted
+
+
+class RateLimiter:
+    def __init__(self):
+        self.backend = None
+        self._rules = {}
+
+    def init_app(self, app):
+        app.config.setdefault("RATE_LIMIT_ENABLED", True)
+        app.config.setdefault("RATE_LIMITS", DEFAULT_RATE_LIMITS)
+        app.config.setdefault("RATE_LIMIT_BACKEND", "memory")
+
+        self.backend = DatabaseBackend() if app.config["RATE_LIMIT_BACKEND"] == "database" else MemoryBackend()
+        self._rules = {name: parse_limit(value) for name, value in app.config["RATE_LIMITS"].items()}
+        app.before_request(self.check)
+
+    def rule_for(self, endpoint):
+        if endpoint is None:
+            return None, None
+        rule = self._rules.get(endpoint)
+        if rule is not None:
+            return endpoint, rule
+        blueprint = endpoint.partition(".")[0]
+        return blueprint, self._rules.get(blueprint)
+
+    def client_key(self):
+        if "Authorization" in request.headers:
+            try:
+                verify_jwt_in_request(optional=True)
+                identity = get_jwt_identity()
+                if identity is not None:
+                    return f"user:{identity}"
+            except Exception:
+                pass  # invalid tokens are rejected by the route itself
+        return f"ip:{request.remote_addr}"
+
+    def check(self):
+        if request.method == "OPTIONS" or not current_app.config["RATE_LIMIT_ENABLED"]:
+            return None
+        scope, rule = self.rule_for(request.endpoint)
+        if rule is None:
+            return None
+
+        limit, period = rule
+        now = time.time()
+        window_index = int(now // period)
+        elapsed = (now % period) / period
+
+        current, previous = self.backend.hit(f"{scope}:{self.client_key()}", period, window_index)
+        # Previous window's requests, weighted by how much of it still overlaps the sliding window.
+        if previous * (1 - elapsed) + current <= limit:
+            return None
+
+        if current >= limit or previous == 0:
+            retry_after = period * (1 - elapsed)
+        else:
+            # Wait until enough of the previous window has slid out.
+            needed = 1 - (limit - current) / previous
+            retry_after = (needed - elapsed) * period
+        return error(
+            "Too many requests, please slow down",
+            429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+rate_limiter = RateLimiter()
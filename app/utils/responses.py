@@ -1,5 +1,7 @@
 # RENTAL_CAR/app/utils/responses.py
-from flask import jsonify
+from datetime import datetime
+
+from flask import current_app, jsonify, request
 
 
 def ok(data=None, status_code: int = 200):
@@ -7,5 +9,24 @@ def ok(data=None, status_code: int = 200):
     return jsonify(payload), status_code
 
 
-def error(message: str, status_code: int):
-    return jsonify({"message": message}), status_code
+def error(message: str, status_code: int, extra: dict | None = None, headers: dict | None = None):
+    payload = {"message": message}
+    if extra:
+        payload.update(extra)
+    if headers:
+        return jsonify(payload), status_code, headers
+    return jsonify(payload), status_code
+
+
+def cached_ok(entry, max_age: int = 0):
+    """
+    200 with a pre-serialised JSON body, or 304 if the client already has it.
+    entry: anything with .body (bytes), .etag (unquoted) and .expires_at (naive local datetime or None).
+    """
+    if entry.expires_at is not None:
+        max_age = max(0, min(max_age, int((entry.expires_at - datetime.now()).total_seconds())))
+    headers = {"ETag": f'"{entry.etag}"', "Cache-Control": f"public, max-age={max_age}, must-revalidate"}
+
+    if request.if_none_match.contains_weak(entry.etag):
+        return "", 304, headers
+    return current_app.response_class(entry.body, mimetype="application/json"), 200, headers
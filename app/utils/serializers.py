@@ -0,0 +1,90 @@
+# RENTAL_CAR/app/utils/serializers.py
+"""
+Compiled serializers: schema.dump() output from a function generated once
+per schema instance (i.e. per schema class and field set).
+
+The generated function reads each attribute directly and converts the
+common field types inline (Integer, String, Boolean, iso DateTime, Decimal,
+Raw, Nested). Any other field is handed to the field's own serialize(), so
+the result always equals what schema.dump() returns. Rows can be ORM
+instances or Row objects from with_entities(), as long as their attribute
+names match the schema's. Schemas with pre/post_dump hooks are not
+supported (none of ours have any).
+"""
+import decimal
+import keyword
+from functools import lru_cache
+
+from marshmallow import fields as ma_fields, missing
+
+
+def _is_plain_attribute(attr):
+    return attr.isidentifier() and not keyword.iskeyword(attr)
+
+
+def _inline(field, index, env):
+    """Expression converting local `v` like field._serialize would, or None for the slow path."""
+    kind = type(field)
+    if kind is ma_fields.Raw:
+        return "v"
+    if kind is ma_fields.Integer and not field.as_string:
+        return "None if v is None else (v if v.__class__ is int else int(v))"
+    if kind is ma_fields.String:
+        return "None if v is None else (v if v.__class__ is str else str(v))"
+    if kind is ma_fields.Boolean:
+        env[f"f{index}"] = field
+        return f"v if v is None or v is True or v is False else f{index}._serialize(v, None, None)"
+    if kind is ma_fields.DateTime and (field.format or field.DEFAULT_FORMAT) == "iso":
+        return "None if v is None else v.isoformat()"
+    if kind is ma_fields.Decimal and not field.as_string:
+        env[f"f{index}"] = field
+        slow = f"f{index}._serialize(v, None, None)"
+        if field.places is None:
+            return f"None if v is None else (v if v.__class__ is Decimal and v.is_finite() else {slow})"
+        env[f"p{index}"] = field.places
+        env[f"r{index}"] = field.rounding
+        return (
+            f"None if v is None else (v.quantize(p{index}, rounding=r{index}) "
+            f"if v.__class__ is Decimal and v.is_finite() else {slow})"
+        )
+    if kind is ma_fields.Nested:
+        env[f"n{index}"] = compile_serializer(field.schema)
+        if field.many or field.schema.many:
+            return f"None if v is None else [n{index}(item) for item in v]"
+        return f"None if v is None else n{index}(v)"
+    return None
+
+
+@lru_cache(maxsize=512)
+def compile_serializer(schema):
+    """Returns serialize(row) -> dict, equal to schema.dump(row) for a single row."""
+    env = {"Decimal": decimal.Decimal, "missing": missing, "get_attribute": schema.get_attribute}
+    lines = ["def serialize(obj):", "    out = {}"]
+
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attr = field.attribute or name
+        expression = _inline(field, index, env) if _is_plain_attribute(attr) else None
+        if expression is None:
+            env[f"f{index}"] = field
+            lines.append(f"    r = f{index}.serialize({attr!r}, obj, accessor=get_attribute)")
+            lines.append("    if r is not missing:")
+            lines.append(f"        out[{key!r}] = r")
+        else:
+            lines.append(f"    v = obj.{attr}")
+            lines.append(f"    out[{key!r}] = {expression}")
+
+    lines.append("    return out")
+    exec(compile("\n".join(lines), f"<serializer {type(schema).__name__}>", "exec"), env)
+    return env["serialize"]
+
+
+def dump_rows(schema, rows):
+    """Compiled equivalent of schema.dump(rows, many=True)."""
+    serialize = compile_serializer(schema)
+    return [serialize(row) for row in rows]
+
+
+def entity_columns(schema, model):
+    """Model columns for query.with_entities() covering the schema's dump fields."""
+    return [getattr(model, field.attribute or name) for name, field in schema.dump_fields.items()]
@@ -17,17 +17,19 @@ const NotificationBell = () => {
         }
     };
 
+    // Badge polling only needs the count; the list is fetched when the bell is opened.
     useEffect(() => {
         if (!token || token === "null") return;
 
-        const fetchInternal = async () => {
-            // ✅ Add trailing slash
-            const data = await api.get('/notifications/');
-            handleData(data);
+        const fetchCount = async () => {
+            const data = await api.get('/notifications/unread-count');
+            if (data.ok && typeof data.count === 'number') {
+                setUnreadCount(data.count);
+            }
         };
 
-        fetchInternal();
-        const interval = setInterval(fetchInternal, 30000);
+        fetchCount();
+        const interval = setInterval(fetchCount, 30000);
         return () => clearInterval(interval);
     }, [token]);
 
@@ -36,6 +38,11 @@ const NotificationBell = () => {
         handleData(data);
     };
 
+    const toggleOpen = () => {
+        if (!isOpen) handleManualRefresh();
+        setIsOpen(!isOpen);
+    };
+
     const markRead = async (id) => {
         setNotifications(prev => prev.map(n => n.id === id ? { ...n, is_read: true } : n));
         setUnreadCount(prev => Math.max(0, prev - 1));
@@ -43,9 +50,17 @@ const NotificationBell = () => {
         await api.patch(`/notifications/${id}/read`);
     };
 
+    // One request for all unread items instead of one PATCH per notification
+    const markAllRead = async () => {
+        setNotifications(prev => prev.map(n => ({ ...n, is_read: true })));
+        setUnreadCount(0);
+
+        await api.patch('/notifications/read', { all: true });
+    };
+
     return (
         <div className="relative">
-            <button onClick={() => setIsOpen(!isOpen)} className="relative p-2 hover:bg-gray-100 rounded-full transition-colors">
+            <button onClick={toggleOpen} className="relative p-2 hover:bg-gray-100 rounded-full transition-colors">
                 <Bell size={20} className="text-gray-600" />
                 {unreadCount > 0 && (
                     <span className="absolute top-1 right-1 w-2.5 h-2.5 bg-red-500 rounded-full border-2 border-white"></span>
@@ -56,7 +71,10 @@ const NotificationBell = () => {
                 <div className="absolute right-0 mt-2 w-80 bg-white rounded-xl shadow-xl border border-gray-100 py-2 z-50">
                     <div className="px-4 py-2 border-b border-gray-100 flex justify-between items-center">
                         <h3 className="font-bold text-sm text-gray-800">Notifications</h3>
-                        <button onClick={handleManualRefresh} className="text-xs text-indigo-600 hover:underline">Refresh</button>
+                        <div className="flex gap-3">
+                            <button onClick={markAllRead} className="text-xs text-indigo-600 hover:underline">Mark all read</button>
+                            <button onClick={handleManualRefresh} className="text-xs text-indigo-600 hover:underline">Refresh</button>
+                        </div>
                     </div>
                     <div className="max-h-64 overflow-y-auto">
                         {notifications.length === 0 ? (
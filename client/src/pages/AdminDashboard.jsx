@@ -41,6 +41,7 @@ const AdminDashboard = () => {
     
     // Unified Data State
     const [data, setData] = useState([]); 
+    const [nextCursor, setNextCursor] = useState(null); // admin lists are paginated server-side
     const [categories, setCategories] = useState([]); // ✅ Added Categories State
     
     const [isModalOpen, setIsModalOpen] = useState(false);
@@ -84,8 +85,10 @@ const AdminDashboard = () => {
             if (res.ok) {
                 const result = await res.json();
                 setData(result.items || result.bookings || result.coupons || []);
+                setNextCursor(result.next_cursor || null);
             } else {
                 setData([]);
+                setNextCursor(null);
             }
         } catch {
             toast.error("Failed to load data");
@@ -94,6 +97,21 @@ const AdminDashboard = () => {
         }
     }, [token, activeTab]);
 
+    const loadMore = async () => {
+        try {
+            const res = await fetch(`${API_URL}/admin/${activeTab}?cursor=${nextCursor}`, {
+                headers: { Authorization: `Bearer ${token}` }
+            });
+            if (res.ok) {
+                const result = await res.json();
+                setData(prev => [...prev, ...(result.items || [])]);
+                setNextCursor(result.next_cursor || null);
+            }
+        } catch {
+            toast.error("Failed to load more");
+        }
+    };
+
     // ✅ Fix: Log error to avoid ESLint warning
     const fetchCategories = useCallback(async () => {
         if (!token) return;
@@ -401,6 +419,11 @@ const AdminDashboard = () => {
                                 </tbody>
                             </table>
                             {data.length === 0 && <div className="p-8 text-center text-gray-400 text-sm">No records found.</div>}
+                            {nextCursor && (
+                                <div className="p-4 text-center">
+                                    <button onClick={loadMore} className="text-indigo-600 text-sm font-bold hover:underline">Load more</button>
+                                </div>
+                            )}
                         </div>
                     )}
                 </div>
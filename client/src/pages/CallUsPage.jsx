@@ -29,29 +29,54 @@ const CallUsPage = () => {
         return () => clearInterval(timer);
     }, [status]);
 
-    // ✅ 3. Status Polling (Checks Server every 3 seconds)
+    // ✅ 3. Status Updates (long-poll: the server answers as soon as the status changes)
     useEffect(() => {
-        const checkStatus = async () => {
+        let cancelled = false;
+
+        const applyStatus = (newStatus) => {
+            setStatus(newStatus); // Update status (APPROVED, CANCELLED, or PENDING)
+
+            // If backend says it's cancelled (due to timeout or admin), set timer to 0
+            if (newStatus === 'CANCELLED') {
+                setTimeLeft(0);
+            }
+        };
+
+        const watchStatus = async () => {
+            let known = null;
             try {
-                // Fetch the specific booking
+                // Fetch the specific booking once
                 const res = await api.get(`/bookings/${bookingId}`);
-                if (res && res.status) {
-                    setStatus(res.status); // Update status (APPROVED, CANCELLED, or PENDING)
-                    
-                    // If backend says it's cancelled (due to timeout or admin), set timer to 0
-                    if (res.status === 'CANCELLED') {
-                        setTimeLeft(0);
-                    }
+                if (res && res.ok && res.status) {
+                    known = res.status;
+                    applyStatus(known);
                 }
             } catch (error) {
                 console.error("Error checking status:", error);
             }
+
+            while (!cancelled && known === 'PENDING') {
+                const res = await api.get(`/events/wait?booking_id=${bookingId}&booking_status=${known}`);
+                if (cancelled) return;
+
+                if (res.ok && res.changed && res.booking) {
+                    known = res.booking.status;
+                    applyStatus(known);
+                } else if (res.ok && res.retry_after) {
+                    // Server has no free waiter slot; ask again later
+                    await new Promise(resolve => setTimeout(resolve, res.retry_after * 1000));
+                } else if (!res.ok && res.status >= 400 && res.status < 500 && res.status !== 429) {
+                    // Not found / logged out / bad request: retrying won't help
+                    return;
+                } else if (!res.ok) {
+                    // Back off briefly on errors instead of hammering the server
+                    await new Promise(resolve => setTimeout(resolve, 3000));
+                }
+            }
         };
 
-        // Run immediately then every 3 seconds
-        checkStatus();
-        const interval = setInterval(checkStatus, 3000);
-        return () => clearInterval(interval);
+        watchStatus();
+        return () => { cancelled = true; };
     }, [bookingId]);
 
     const minutes = Math.floor(timeLeft / 60);
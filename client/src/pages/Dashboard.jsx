@@ -51,10 +51,14 @@ const CountdownTimer = ({ createdAt }) => {
     );
 };
 
+const ACTIVE_STATUSES = 'PENDING,APPROVED,CONFIRMED';
+const HISTORY_STATUSES = 'COMPLETED,CANCELLED';
+
 const Dashboard = () => {
     const [activeView, setActiveView] = useState('browse'); // 'browse', 'current', 'pending', 'history'
     const [cars, setCars] = useState([]);
     const [bookings, setBookings] = useState([]); 
+    const [historyCursor, setHistoryCursor] = useState(null); // next page of past bookings
     const [selectedCar, setSelectedCar] = useState(null);
     const [loading, setLoading] = useState(true);
     const [searchTerm, setSearchTerm] = useState('');
@@ -67,13 +71,16 @@ const Dashboard = () => {
         const fetchData = async () => {
             setLoading(true);
             try {
-                const [carRes, bookingRes] = await Promise.all([
+                // Active bookings are few; history is paged (see loadMoreHistory)
+                const [carRes, activeRes, historyRes] = await Promise.all([
                     api.get('/public/cars'),
-                    api.get('/bookings/')
+                    api.get(`/bookings/?status=${ACTIVE_STATUSES}&limit=200`),
+                    api.get(`/bookings/?status=${HISTORY_STATUSES}`)
                 ]);
                 
                 if (carRes.items) setCars(carRes.items);
-                if (bookingRes.bookings) setBookings(bookingRes.bookings);
+                setBookings([...(activeRes.bookings || []), ...(historyRes.bookings || [])]);
+                setHistoryCursor(historyRes.next_cursor || null);
             } catch (error) {
                 console.error("Failed to load dashboard data", error);
             } finally {
@@ -83,6 +90,12 @@ const Dashboard = () => {
         fetchData();
     }, []);
 
+    const loadMoreHistory = async () => {
+        const res = await api.get(`/bookings/?status=${HISTORY_STATUSES}&cursor=${historyCursor}`);
+        if (res.bookings) setBookings(prev => [...prev, ...res.bookings]);
+        setHistoryCursor(res.next_cursor || null);
+    };
+
     // --- FILTERS ---
     const filteredCars = cars.filter(car => 
         car.name.toLowerCase().includes(searchTerm.toLowerCase()) || 
@@ -294,6 +307,11 @@ const Dashboard = () => {
 
                 {/* 4. HISTORY VIEW */}
                 {activeView === 'history' && renderBookingList(historyBookings, "Booking History", "You haven't completed any trips yet.")}
+                {activeView === 'history' && historyCursor && (
+                    <div className="text-center mt-6">
+                        <button onClick={loadMoreHistory} className="text-indigo-600 font-bold hover:underline">Load older bookings</button>
+                    </div>
+                )}
 
             </div>
 
@@ -3,12 +3,25 @@ import { useAuthStore } from '../store/authStore';
 
 const BASE_URL = 'http://localhost:5000';
 
+// Time of our last write (X-Last-Write), echoed back so the API serves our
+// next reads from the primary database instead of a lagging replica.
+let lastWrite = null;
+
+const rememberWrite = (res) => {
+    const value = res.headers.get('X-Last-Write');
+    if (value) lastWrite = value;
+};
+
 const getHeaders = () => {
     const token = useAuthStore.getState().token;
     const headers = {
         'Content-Type': 'application/json',
     };
 
+    if (lastWrite) {
+        headers['X-Last-Write'] = lastWrite;
+    }
+
     // Only add Authorization if token exists and is valid
     if (token && token !== "null" && token !== "undefined") {
         headers['Authorization'] = `Bearer ${token}`;
@@ -50,6 +63,7 @@ export const api = {
                 headers,
                 body: JSON.stringify(body)
             });
+            rememberWrite(res);
 
             const data = await res.json();
             
@@ -72,6 +86,7 @@ export const api = {
                 headers,
                 body: JSON.stringify(body)
             });
+            rememberWrite(res);
 
             const data = await res.json();
             if (!res.ok) return { ok: false, status: res.status, data };
@@ -90,6 +105,7 @@ export const api = {
                 method: 'DELETE',
                 headers
             });
+            rememberWrite(res);
             
             if (!res.ok) return { ok: false, status: res.status };
             return { ok: true, status: res.status };
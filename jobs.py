@@ -0,0 +1,14 @@
+# RENTAL_CAR/jobs.py
+# Dedicated background job process: `python jobs.py`
+# Safe to run more than one (e.g. one per host); only the lease holder runs jobs.
+from app import create_app
+from app.jobs import JobRunner
+
+app = create_app()
+
+if __name__ == "__main__":
+    runner = JobRunner(app)
+    try:
+        runner.start()
+    except (KeyboardInterrupt, SystemExit):
+        runner.shutdown()
@@ -0,0 +1,47 @@
+"""Normalize coupon codes to trimmed upper case
+
+Revision ID: 2f8b6d17c3e5
+Revises: 1c7e5a93b2d4
+Create Date: 2026-10-18 17:31:06.447120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f8b6d17c3e5'
+down_revision = '1c7e5a93b2d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Lookups are now an exact match on the unique index (see normalize_coupon_code).
+    coupons = sa.table('coupons', sa.column('id', sa.Integer), sa.column('code', sa.String(50)))
+    normalized = sa.func.upper(sa.func.trim(coupons.c.code))
+
+    # Codes differing only in case or surrounding spaces (possible under a
+    # case-sensitive collation, SQLite, or with leading spaces) would collide
+    # on the unique index. Bookings reference them, so don't guess which to keep.
+    conn = op.get_bind()
+    clashes = conn.execute(
+        sa.select(normalized, sa.func.count())
+        .group_by(normalized)
+        .having(sa.func.count() > 1)
+        .order_by(normalized)
+    ).all()
+    if clashes:
+        listed = ', '.join(f'{code} ({count} rows)' for code, count in clashes)
+        raise RuntimeError(
+            'Cannot normalize coupon codes: these codes clash once trimmed and '
+            f'upper-cased: {listed}. Rename or merge the duplicates in the '
+            'coupons table (and repoint bookings.coupon_id), then rerun the upgrade.'
+        )
+
+    op.execute(coupons.update().values(code=normalized))
+
+
+def downgrade():
+    # Original casing is not recoverable; upper-case codes still work with the old lookup.
+    pass
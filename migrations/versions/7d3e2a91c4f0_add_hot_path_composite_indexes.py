@@ -0,0 +1,36 @@
+"""Add composite indexes for booking and notification hot paths
+
+Revision ID: 7d3e2a91c4f0
+Revises: 0a8c19528135, 1cb15ca514eb
+Create Date: 2026-10-18 10:12:04.118230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3e2a91c4f0'
+down_revision = ('0a8c19528135', '1cb15ca514eb')
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.create_index('ix_bookings_car_status_window', ['car_id', 'status', 'start_time', 'end_time'], unique=False)
+        batch_op.create_index('ix_bookings_status_created', ['status', 'created_at'], unique=False)
+        batch_op.create_index('ix_bookings_user_created', ['user_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_user_created', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_created')
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookings_user_created')
+        batch_op.drop_index('ix_bookings_status_created')
+        batch_op.drop_index('ix_bookings_car_status_window')
@@ -0,0 +1,79 @@
+"""Add per-vehicle car_units and bookings.unit_id
+
+Revision ID: c8a05e3b1d92
+Revises: b41f6c0d8e27
+Create Date: 2026-10-18 13:05:27.331904
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8a05e3b1d92'
+down_revision = 'b41f6c0d8e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('car_units',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('car_id', sa.Integer(), nullable=False),
+    sa.Column('number_plate', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['car_id'], ['cars.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('number_plate')
+    )
+    with op.batch_alter_table('car_units', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_car_units_car_id'), ['car_id'], unique=False)
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('unit_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_bookings_unit_id_car_units', 'car_units', ['unit_id'], ['id'])
+        batch_op.create_index('ix_bookings_unit_window', ['unit_id', 'start_time', 'end_time'], unique=False)
+
+    # One unit per existing Car.quantity; the first one inherits the car's plate
+    # unless it is blank or an earlier car already claimed it (number_plate is unique).
+    # Existing bookings keep unit_id NULL and still count against the model.
+    conn = op.get_bind()
+    car_units = sa.table('car_units',
+        sa.column('car_id', sa.Integer),
+        sa.column('number_plate', sa.String),
+        sa.column('status', sa.String),
+        sa.column('created_at', sa.DateTime),
+    )
+    created_at = datetime.utcnow()
+    rows = []
+    seen_plates = set()
+    cars = conn.execute(sa.text('SELECT id, quantity, number_plate FROM cars ORDER BY id'))
+    for car_id, quantity, number_plate in cars:
+        plate = (number_plate or '').strip().upper() or None
+        if plate in seen_plates:
+            plate = None
+        seen_plates.add(plate)
+        for i in range(quantity or 1):
+            rows.append({
+                'car_id': car_id,
+                'number_plate': plate if i == 0 else None,
+                'status': 'ACTIVE',
+                'created_at': created_at,
+            })
+    if rows:
+        op.bulk_insert(car_units, rows)
+
+
+def downgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookings_unit_window')
+        batch_op.drop_constraint('fk_bookings_unit_id_car_units', type_='foreignkey')
+        batch_op.drop_column('unit_id')
+
+    with op.batch_alter_table('car_units', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_car_units_car_id'))
+
+    op.drop_table('car_units')
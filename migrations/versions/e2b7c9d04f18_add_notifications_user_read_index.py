@@ -0,0 +1,26 @@
+"""Add (user_id, is_read) index on notifications
+
+Revision ID: e2b7c9d04f18
+Revises: d5e9f1a24b63
+Create Date: 2026-10-18 15:02:44.208517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7c9d04f18'
+down_revision = 'd5e9f1a24b63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_user_read', ['user_id', 'is_read'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_read')
@@ -1,6 +1,7 @@
 # RENTAL_CAR/seed.py
 from app import create_app
 from app.models import db, User, Car, Category
+from app.services.fleet_service import sync_car_units
 from werkzeug.security import generate_password_hash
 
 app = create_app()
@@ -47,6 +48,8 @@ with app.app_context():
             quantity=2
         )
         db.session.add(car)
+        db.session.flush()
+        sync_car_units(db.session, car) # One CarUnit per physical vehicle
         print("✅ Car created: Toyota Fortuner")
 
     db.session.commit()
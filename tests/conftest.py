@@ -0,0 +1,119 @@
+import itertools
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.models import db, Booking, BookingStatus, Car, Category, Notification, User
+from app.services import invalidation
+from app.services.auth_cache import auth_cache
+from app.services.catalog_cache import catalog_cache
+from app.services.fleet_service import sync_car_units
+from app.services.occupancy_index import occupancy_index
+from app.utils.db_routing import recent_writers
+
+
+def reset_process_state():
+    """Per-process caches and invalidation bookkeeping outlive an app; start each test clean."""
+    auth_cache.invalidate()
+    catalog_cache.invalidate()
+    occupancy_index.invalidate()
+    invalidation._seen_ids.clear()
+    invalidation._seen_order.clear()
+    invalidation._state.update(last_id=None, last_poll=0.0)
+    recent_writers._until.clear()
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """make_app(**env) -> app on a fresh SQLite file with the schema created."""
+    apps = []
+
+    def make(**env):
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'primary.db'}")
+        monkeypatch.setenv("JWT_SECRET", "test-secret-that-is-long-enough-for-hs256")
+        monkeypatch.setenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        app = create_app()
+        app.config.update(TESTING=True, RATE_LIMIT_ENABLED=False)
+        with app.app_context():
+            for engine in db.engines.values():
+                db.metadata.create_all(engine)
+        apps.append(app)
+        return app
+
+    reset_process_state()
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+    reset_process_state()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class Seed:
+    """Creates rows directly through the session; call inside an app context."""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+
+    def user(self, is_admin=False):
+        user = User(username=f"user{next(self._ids)}", password_hash="unused", is_admin=is_admin)
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    def car(self, quantity=1):
+        category = Category.query.first()
+        if category is None:
+            category = Category(name="SUV")
+            db.session.add(category)
+        number = next(self._ids)
+        car = Car(
+            name=f"Model {number}", brand="Toyota", slug=f"toyota-model-{number}", category=category,
+            transmission="AUTO", daily_rate=Decimal("100.00"), twelve_hour_rate=Decimal("60.00"),
+            quantity=quantity,
+        )
+        db.session.add(car)
+        db.session.flush()
+        sync_car_units(db.session, car)
+        db.session.commit()
+        return car
+
+    def bookings(self, user, car, count, status=BookingStatus.APPROVED):
+        start = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+        for i in range(count):
+            db.session.add(Booking(
+                user_id=user.id, car_id=car.id, unit_id=car.units[0].id,
+                start_time=start + timedelta(days=2 * i), end_time=start + timedelta(days=2 * i + 1),
+                total_price=Decimal("100.00"), status=status,
+            ))
+            db.session.add(Notification(user_id=user.id, message=f"Booking {i} approved"))
+        db.session.commit()
+
+
+@pytest.fixture
+def seed():
+    return Seed()
+
+
+def auth_headers(user):
+    """Bearer headers for `user`, with the claims issued at login. Needs an app context."""
+    token = create_access_token(
+        identity=str(user.id), additional_claims={"is_admin": user.is_admin, "tv": user.token_version},
+    )
+    return {"Authorization": f"Bearer {token}"}
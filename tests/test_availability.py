@@ -0,0 +1,91 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models import db, Booking, BookingStatus, Car
+from app.services.booking_service import (
+    availability_calendar, search_available_cars, suggest_alternatives, turnaround_hours,
+)
+from app.services.occupancy_index import SPAN_AHEAD, occupancy_index
+from app.utils.dates import get_ist_time
+
+
+def _book(user, car, start, hours, status=BookingStatus.APPROVED):
+    db.session.add(Booking(
+        user_id=user.id, car_id=car.id, start_time=start, end_time=start + timedelta(hours=hours),
+        total_price=Decimal("100.00"), status=status,
+    ))
+
+
+@pytest.fixture
+def fleet(app, seed):
+    """Two cars of one category with overlapping bookings over the next few days."""
+    with app.app_context():
+        user = seed.user()
+        busy, peer = seed.car(quantity=2), seed.car(quantity=1)
+        origin = get_ist_time().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+        for offset, hours in ((0, 10), (3, 30), (5, 4), (40, 12)):
+            _book(user, busy, origin + timedelta(hours=offset), hours)
+        _book(user, busy, origin, 48, status=BookingStatus.CANCELLED)
+        _book(user, peer, origin + timedelta(hours=6), 20)
+        # Beyond the cached span; only queries reaching that far may see it.
+        _book(user, busy, origin + SPAN_AHEAD + timedelta(days=1), 10)
+        _book(user, busy, origin + SPAN_AHEAD + timedelta(days=1), 10)
+        db.session.commit()
+        return busy.id, peer.id, origin
+
+
+def _results(app, fleet, cached):
+    busy_id, peer_id, origin = fleet
+    app.config["OCCUPANCY_CACHE_ENABLED"] = cached
+    with app.app_context():
+        busy = db.session.get(Car, busy_id)
+        cars = [busy, db.session.get(Car, peer_id)]
+        far = origin + SPAN_AHEAD + timedelta(days=1)
+        return {
+            "calendar": availability_calendar(db.session, cars, origin - timedelta(hours=5), 72, timedelta(hours=1)),
+            "far_calendar": availability_calendar(db.session, cars, far - timedelta(days=1), 3, timedelta(days=1)),
+            "search": [
+                (car.id, free)
+                for car, free in search_available_cars(db.session, origin + timedelta(hours=4), origin + timedelta(hours=8))
+            ],
+            "suggest": suggest_alternatives(
+                db.session, busy, origin + timedelta(hours=4), origin + timedelta(hours=8),
+                earliest=origin - timedelta(hours=12), latest_start=origin + timedelta(days=10),
+            ),
+        }
+
+
+def test_occupancy_index_matches_database(app, fleet):
+    direct = _results(app, fleet, cached=False)
+    cached = _results(app, fleet, cached=True)
+    assert cached == direct
+    assert direct["far_calendar"][fleet[0]] == [0, 0, 2]
+
+
+def test_calendar_matches_per_slot_overlap(app, fleet):
+    busy_id, _, origin = fleet
+    start, step = origin - timedelta(hours=5), timedelta(hours=1)
+    with app.app_context():
+        car = db.session.get(Car, busy_id)
+        calendar = availability_calendar(db.session, [car], start, 72, step)[busy_id]
+        buffer = timedelta(hours=turnaround_hours(car))
+        blocking = [b for b in car.bookings if b.status in BookingStatus.BLOCKING]
+    expected = [
+        car.quantity - sum(
+            b.start_time - buffer < start + step * (i + 1) and b.end_time + buffer > start + step * i
+            for b in blocking
+        )
+        for i in range(72)
+    ]
+    assert calendar == [max(free, 0) for free in expected]
+
+
+def test_occupancy_index_span_is_bounded(app, fleet):
+    busy_id, _, origin = fleet
+    app.config["OCCUPANCY_CACHE_ENABLED"] = True
+    with app.app_context():
+        entry = occupancy_index.load(db.session, [busy_id], origin, origin + timedelta(days=1))[busy_id]
+        assert len(entry.starts) == 4
+        assert entry.span_end <= get_ist_time() + SPAN_AHEAD
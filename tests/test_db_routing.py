@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from app.models import db, Notification, User
+from app.services import invalidation
+from app.utils.db_routing import LAST_WRITE_HEADER
+from tests.conftest import auth_headers, reset_process_state
+
+
+@pytest.fixture
+def replicated(make_app, tmp_path, seed):
+    """App with an (empty, never replicated) replica: rows seeded on the primary only."""
+    app = make_app(DATABASE_REPLICA_URL=f"sqlite:///{tmp_path / 'replica.db'}")
+    with app.app_context():
+        user = seed.user()
+        seed.bookings(user, seed.car(), 2)
+        notification_id = Notification.query.first().id
+        headers = auth_headers(user)
+    return app, headers, notification_id
+
+
+def _visible(client, headers):
+    """Notifications the read sees: 2 from the primary, 0 from the replica."""
+    return len(client.get("/notifications/", headers=headers).get_json()["items"])
+
+
+def test_reads_go_to_the_replica(replicated):
+    app, headers, _ = replicated
+    assert _visible(app.test_client(), headers) == 0
+
+
+def test_recent_last_write_header_reads_the_primary(replicated):
+    app, headers, _ = replicated
+    client = app.test_client()
+    assert _visible(client, {**headers, LAST_WRITE_HEADER: f"{time.time():.3f}"}) == 2
+    assert _visible(client, {**headers, LAST_WRITE_HEADER: f"{time.time() - 60:.3f}"}) == 0
+
+
+def test_write_response_carries_last_write(replicated):
+    app, headers, notification_id = replicated
+    res = app.test_client().patch(f"/notifications/{notification_id}/read", headers=headers)
+    assert res.status_code == 200
+    assert time.time() - float(res.headers[LAST_WRITE_HEADER]) < 5
+
+
+def test_writer_reads_the_primary_in_every_process(replicated):
+    app, headers, notification_id = replicated
+    client = app.test_client()
+    client.patch(f"/notifications/{notification_id}/read", headers=headers)
+
+    # Same process: the marker was applied when the write committed.
+    assert _visible(client, headers) == 2
+
+    # Another process: it learns of the marker from the invalidation log.
+    reset_process_state()
+    invalidation._state["last_id"] = 0
+    assert _visible(client, headers) == 2
+
+    # Nobody else is sticky.
+    with app.app_context():
+        other = auth_headers(User(id=999, is_admin=False, token_version=0))
+    assert _visible(client, other) == 0
+
+
+def test_in_memory_sqlite_gets_no_queue_pool_options(make_app):
+    app = make_app(DATABASE_URL="sqlite://")
+    with app.app_context():
+        assert db.session.execute(db.select(1)).scalar() == 1
@@ -0,0 +1,44 @@
+import time
+
+from app.models import BookingStatus
+from app.services.events import change_bus
+from tests.conftest import auth_headers
+
+
+def _booking(app, seed):
+    with app.app_context():
+        user, car = seed.user(), seed.car()
+        seed.bookings(user, car, 1, status=BookingStatus.PENDING)
+        return auth_headers(user), user.bookings[0].id
+
+
+def test_wait_answers_at_once_when_waiters_are_capped(app, client, seed):
+    headers, booking_id = _booking(app, seed)
+    app.config["EVENTS_MAX_WAITERS"] = 0
+
+    started = time.monotonic()
+    res = client.get(f"/events/wait?booking_id={booking_id}&booking_status=PENDING&timeout=30", headers=headers)
+    assert time.monotonic() - started < 5
+    assert res.status_code == 200
+    assert res.get_json()["changed"] is False
+    assert res.get_json()["retry_after"] > 0
+    assert change_bus.waiter_count() == 0
+
+
+def test_capped_wait_still_reports_changes(app, client, seed):
+    headers, booking_id = _booking(app, seed)
+    app.config["EVENTS_MAX_WAITERS"] = 0
+
+    res = client.get(f"/events/wait?booking_id={booking_id}&booking_status=APPROVED", headers=headers)
+    assert res.get_json() == {"changed": True, "booking": {"id": booking_id, "status": BookingStatus.PENDING}}
+
+    res = client.get("/events/wait?booking_id=999&booking_status=PENDING", headers=headers)
+    assert res.status_code == 404
+
+
+def test_waiter_is_released_after_timeout(app, client, seed):
+    headers, booking_id = _booking(app, seed)
+
+    res = client.get(f"/events/wait?booking_id={booking_id}&booking_status=PENDING&timeout=1", headers=headers)
+    assert res.get_json() == {"changed": False}
+    assert change_bus.waiter_count() == 0
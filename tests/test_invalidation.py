@@ -0,0 +1,32 @@
+from app.models import db
+from app.services import invalidation
+from app.utils.query_stats import query_stats
+
+
+def test_poll_skips_events_dispatched_at_commit(app):
+    received = []
+    invalidation.subscribe("test-topic", received.append)
+    with app.app_context():
+        invalidation.poll(db.session, force=True)  # sets the high-water mark
+
+        invalidation.publish(db.session, "test-topic", 7)
+        db.session.flush()
+        with query_stats.capture() as stats:
+            db.session.commit()
+        assert received == ["7"]
+        assert stats.count == 0  # nothing reloaded after the commit
+
+        invalidation.poll(db.session, force=True)
+        assert received == ["7"]
+
+
+def test_poll_dispatches_events_from_other_processes(app):
+    received = []
+    invalidation.subscribe("test-remote-topic", received.append)
+    with app.app_context():
+        invalidation.poll(db.session, force=True)
+        db.session.add(invalidation.InvalidationEvent(topic="test-remote-topic", key="8"))
+        db.session.commit()
+
+        invalidation.poll(db.session, force=True)
+        assert received == ["8"]
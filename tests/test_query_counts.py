@@ -0,0 +1,55 @@
+import pytest
+
+from app.models import db, Car, User
+from app.services import invalidation
+from app.utils.query_stats import query_stats
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def no_polling(monkeypatch):
+    # Keep throttled invalidation polls from landing in one measurement but not the other.
+    monkeypatch.setattr(invalidation, "POLL_INTERVAL_SECONDS", 3600)
+
+
+def _count(client, url, headers):
+    client.get(url, headers=headers)  # warm the per-process caches
+    with query_stats.capture() as stats:
+        res = client.get(url, headers=headers)
+    assert res.status_code == 200
+    return stats.count
+
+
+def test_user_list_queries_do_not_grow_with_rows(app, client, seed, no_polling):
+    with app.app_context():
+        headers = auth_headers(seed.user(is_admin=True))
+        car_id = seed.car().id
+
+    def add_users(count):
+        with app.app_context():
+            for _ in range(count):
+                seed.bookings(seed.user(), db.session.get(Car, car_id), 2)
+
+    add_users(5)
+    small = _count(client, "/admin/users?limit=50", headers)
+    add_users(5)
+    large = _count(client, "/admin/users?limit=50", headers)
+    assert small == large
+
+
+@pytest.mark.parametrize("url", ["/bookings/?limit=50&include=car,unit,coupon", "/admin/bookings?limit=50"])
+def test_booking_list_queries_do_not_grow_with_rows(app, client, seed, no_polling, url):
+    with app.app_context():
+        user = seed.user(is_admin=True)
+        user_id, headers = user.id, auth_headers(user)
+
+    def add_bookings(count):
+        with app.app_context():
+            for _ in range(count):
+                seed.bookings(db.session.get(User, user_id), seed.car(), 1)
+
+    add_bookings(5)
+    small = _count(client, url, headers)
+    add_bookings(5)
+    large = _count(client, url, headers)
+    assert small == large
@@ -0,0 +1,8 @@
+from app.cli import plan_regressions
+from app.models import db
+
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        regressions = {name: scans for name, scans in plan_regressions(db.session).items() if scans}
+    assert regressions == {}
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models import db, Coupon
+
+
+@pytest.fixture
+def quote_body(app, seed):
+    with app.app_context():
+        car = seed.car()
+        now = datetime.now()
+        db.session.add(Coupon(
+            code="SAVE10", discount_percentage=Decimal("10.00"),
+            valid_from=now - timedelta(days=1), valid_to=now + timedelta(days=30),
+        ))
+        db.session.commit()
+        start = (datetime.utcnow() + timedelta(days=2)).replace(microsecond=0)
+        return {
+            "car_ids": [car.id],
+            "windows": [{"start_time": start.isoformat() + "Z", "end_time": (start + timedelta(days=1)).isoformat() + "Z"}],
+        }
+
+
+def test_quotes_apply_known_coupons(client, quote_body):
+    res = client.post("/public/quotes", json={**quote_body, "coupon_codes": [None, " save10 ", ""]})
+    assert res.status_code == 200
+    prices = [item["total_price"] for item in res.get_json()["items"]]
+    assert prices == ["100.00", "90.00", "100.00"]
+
+
+def test_quotes_reject_unknown_coupons(client, quote_body):
+    res = client.post("/public/quotes", json={**quote_body, "coupon_codes": ["SAVE10", "nope", None, "NOPE2"]})
+    assert res.status_code == 400
+    assert res.get_json()["invalid_coupon_codes"] == ["nope", "NOPE2"]
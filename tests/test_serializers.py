@@ -0,0 +1,34 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from app.cli import sample_rows
+from app.models import db, Notification
+from app.schemas import BookingSchema, NotificationSchema
+from app.utils.projection import projection
+from app.utils.serializers import dump_rows, entity_columns
+
+BOOKINGS, NOTIFICATION_ROWS = sample_rows(30)
+
+
+@pytest.mark.parametrize("schema", [
+    BookingSchema(many=True),
+    projection(MultiDict(), BookingSchema, default_include=("car",)).schema,
+    projection(MultiDict({"fields": "status,start_time", "include": "coupon"}), BookingSchema).schema,
+], ids=["full", "list default", "sparse"])
+def test_compiled_bookings_match_dump(schema):
+    assert dump_rows(schema, BOOKINGS) == schema.dump(BOOKINGS)
+
+
+def test_compiled_rows_match_dump():
+    schema = NotificationSchema(many=True)
+    assert dump_rows(schema, NOTIFICATION_ROWS) == schema.dump(NOTIFICATION_ROWS)
+
+
+def test_compiled_database_rows_match_dump(app, seed):
+    schema = NotificationSchema(many=True)
+    with app.app_context():
+        seed.bookings(seed.user(), seed.car(), 3)
+        rows = Notification.query.with_entities(*entity_columns(schema, Notification)).all()
+        orm = Notification.query.all()
+        assert dump_rows(schema, rows) == schema.dump(orm)
+        assert dump_rows(schema, orm) == schema.dump(orm)